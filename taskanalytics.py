@@ -0,0 +1,192 @@
+"""Productivity analytics over the working set and the archive.
+
+Archive segments are monthly files that only change when tasks are
+archived or restored, so each one is aggregated once, in worker processes
+when there is enough to do, and the partial result is kept until the
+file changes. Only the working set is aggregated on every run. Partial
+aggregates are plain dicts that merge by addition.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import multiprocessing
+import os
+import threading
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from taskmetrics import metrics
+from taskstore import TaskStore
+
+# Less stale segment data (compressed bytes) than this is aggregated
+# in-process; spawning worker processes would cost more than it saves
+PARALLEL_MIN_BYTES = 2 * 1024 * 1024
+
+
+def new_aggregate() -> Dict:
+    return {'total': 0, 'completed': 0, 'completion_days': 0, 'completion_count': 0,
+            'priority': {}, 'category': {}}
+
+
+def aggregate_rows(rows: Iterable[tuple]) -> Dict:
+    """Aggregate (category, priority, completed, created_at, completed_at) rows"""
+    aggregate = new_aggregate()
+    priority_counts = aggregate['priority']
+    category_counts = aggregate['category']
+    completion_days = 0
+    completion_count = 0
+    for category, priority, completed, created_at, completed_at in rows:
+        aggregate['total'] += 1
+        for counts, key in ((priority_counts, priority), (category_counts, category)):
+            if key not in counts:
+                counts[key] = [0, 0]
+            counts[key][0] += 1
+            if completed:
+                counts[key][1] += 1
+        if not completed:
+            continue
+        aggregate['completed'] += 1
+        if completed_at and created_at:
+            try:
+                # fromisoformat reads 'YYYY-MM-DD HH:MM:SS' far faster than strptime
+                completion_days += (datetime.fromisoformat(completed_at) -
+                                    datetime.fromisoformat(created_at)).days
+                completion_count += 1
+            except ValueError:
+                continue
+    aggregate['completion_days'] = completion_days
+    aggregate['completion_count'] = completion_count
+    return aggregate
+
+
+def record_row(data: Dict) -> tuple:
+    """The aggregated fields of a saved task record"""
+    return (data.get('category', 'General'), data.get('priority', 'Medium'),
+            data.get('completed', False), data.get('created_at'), data.get('completed_at'))
+
+
+def aggregate_segment(path: str) -> Tuple[Dict, FrozenSet[int]]:
+    """Aggregate one archive segment file, returning the IDs it covers too
+
+    Runs in worker processes, so it reads the file itself rather than
+    going through a store.
+    """
+    records = [data for data in TaskStore.read_archive_segment(path).values() if data is not None]
+    aggregate = aggregate_rows(record_row(data) for data in records)
+    return aggregate, frozenset(data['id'] for data in records)
+
+
+def merge_aggregates(aggregates: Iterable[Dict]) -> Dict:
+    merged = new_aggregate()
+    for aggregate in aggregates:
+        for name in ('total', 'completed', 'completion_days', 'completion_count'):
+            merged[name] += aggregate[name]
+        for breakdown in ('priority', 'category'):
+            counts = merged[breakdown]
+            for key, (total, completed) in aggregate[breakdown].items():
+                if key not in counts:
+                    counts[key] = [0, 0]
+                counts[key][0] += total
+                counts[key][1] += completed
+    return merged
+
+
+def productivity_metrics(aggregate: Dict) -> Dict:
+    """Turn a merged aggregate into the analytics window's metrics"""
+    total = aggregate['total']
+    if not total:
+        return {}
+    return {
+        'total_tasks': total,
+        'completed_tasks': aggregate['completed'],
+        'completion_rate': aggregate['completed'] / total * 100,
+        'avg_completion_time': (aggregate['completion_days'] / aggregate['completion_count']
+                                if aggregate['completion_count'] else 0),
+        'priority_breakdown': {key: {'total': total, 'completed': completed}
+                               for key, (total, completed) in aggregate['priority'].items()},
+        'category_breakdown': {key: {'total': total, 'completed': completed}
+                               for key, (total, completed) in aggregate['category'].items()}
+    }
+
+
+class AnalyticsEngine:
+    """Productivity metrics with per-segment results cached across runs
+
+    A segment's cached aggregate is keyed on its file size and modification
+    time, so archiving or restoring tasks recomputes just the segments that
+    were written to.
+    """
+
+    def __init__(self, store: TaskStore, workers: Optional[int] = None):
+        self.store = store
+        self.workers = workers  # None means one per CPU
+        self._segments: Dict[str, Tuple[tuple, Dict, FrozenSet[int]]] = {}
+        self._lock = threading.Lock()  # One computation at a time
+
+    @staticmethod
+    def _stamp(path: str) -> Optional[tuple]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def clear_cache(self):
+        with self._lock:
+            self._segments.clear()
+
+    def _aggregate_segments(self, paths: List[str]) -> List[Tuple[Dict, FrozenSet[int]]]:
+        """Aggregates for the given segments, computing only changed ones"""
+        stamps = {path: self._stamp(path) for path in paths}
+        stale = [path for path in paths
+                 if path not in self._segments or self._segments[path][0] != stamps[path]]
+        metrics.incr("analytics.segments_cached", len(paths) - len(stale))
+        metrics.incr("analytics.segments_computed", len(stale))
+
+        results = None
+        workers = min(self.workers or os.cpu_count() or 1, len(stale))
+        if workers > 1 and sum(stamps[path][0] for path in stale if stamps[path]) >= PARALLEL_MIN_BYTES:
+            try:
+                # Forking from a background thread of a process running other
+                # threads can copy their held locks, so workers are spawned
+                with ProcessPoolExecutor(max_workers=workers,
+                                         mp_context=multiprocessing.get_context('spawn')) as pool:
+                    results = list(pool.map(aggregate_segment, stale))
+            except Exception as e:
+                # No usable process pool here; do the work in this process
+                print(f"Error running analytics workers: {e}")
+        if results is None:
+            results = [aggregate_segment(path) for path in stale]
+
+        for path, (aggregate, ids) in zip(stale, results):
+            self._segments[path] = (stamps[path], aggregate, ids)
+        for path in list(self._segments):
+            if path not in stamps:
+                del self._segments[path]
+        return [self._segments[path][1:] for path in paths]
+
+    @metrics.timed("analytics.compute")
+    def compute(self) -> Dict:
+        """Productivity metrics over the working set and the whole archive
+
+        Safe to call from a background thread.
+        """
+        with self._lock:
+            store = self.store
+            with store.lock:
+                # Copy just the fields needed so the store is not held while counting
+                rows = [(task.category, task.priority, task.completed, task.created_at,
+                         task.completed_at) for task in store.tasks]
+                live_ids = set(store._by_id)
+                paths = store.archive_segments()
+
+            parts = [aggregate_rows(rows)]
+            for path, (aggregate, ids) in zip(paths, self._aggregate_segments(paths)):
+                if ids.isdisjoint(live_ids):
+                    parts.append(aggregate)
+                    continue
+                # After an interrupted archive run a task can be in both
+                # places; the working set copy is the one that counts
+                records = TaskStore.read_archive_segment(path)
+                parts.append(aggregate_rows(record_row(data) for task_id, data in records.items()
+                                            if data is not None and task_id not in live_ids))
+            return productivity_metrics(merge_aggregates(parts))
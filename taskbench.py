@@ -0,0 +1,506 @@
+"""Benchmarks for the task store, list rendering, persistence and analytics.
+
+Generates a reproducible synthetic dataset for each size, times the hot
+paths headlessly and writes the results as JSON so runs from different
+versions can be compared:
+
+    python taskbench.py --sizes 1000,10000,100000 --output before.json
+    python taskbench.py --sizes 1000,10000,100000 --compare before.json
+"""
+
+import argparse
+from datetime import date, datetime, timedelta
+import gc
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional
+
+from taskstore import Task, TaskStore, CATEGORIES, PRIORITIES, TIMESTAMP_FORMAT
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+WORDS = ("report invoice review meeting plan budget call email draft update fix "
+         "deploy design test client order refund schedule backup audit release").split()
+
+
+class DatasetConfig:
+    """Shape of a synthetic task dataset"""
+
+    def __init__(self, size: int, seed: int = 42, category_skew: float = 1.0,
+                 priority_skew: float = 0.5, completed_fraction: float = 0.4,
+                 due_fraction: float = 0.7, due_spread_days: int = 365,
+                 overdue_fraction: float = 0.2, description_words: int = 30,
+                 history_days: int = 730, recurring_fraction: float = 0.05,
+                 dependency_fraction: float = 0.5):
+        self.size = size
+        self.seed = seed
+        self.category_skew = category_skew  # Zipf exponent; 0 means uniform
+        self.priority_skew = priority_skew
+        self.completed_fraction = completed_fraction
+        self.due_fraction = due_fraction  # Share of tasks that have a due date
+        self.due_spread_days = due_spread_days  # Due dates fall within +/- this many days
+        self.overdue_fraction = overdue_fraction  # Share of due dates in the past
+        self.description_words = description_words  # Mean description length
+        self.history_days = history_days  # How far back creation dates go
+        self.recurring_fraction = recurring_fraction  # Share of pending dated tasks that repeat
+        self.dependency_fraction = dependency_fraction  # Share of tasks blocked by 1-3 earlier tasks
+
+    def to_dict(self) -> Dict:
+        return dict(self.__dict__)
+
+
+def zipf_weights(count: int, skew: float) -> List[float]:
+    return [1 / (rank + 1) ** skew for rank in range(count)]
+
+
+def generate_tasks(config: DatasetConfig) -> List[Task]:
+    """Build a reproducible list of tasks following the given config"""
+    rng = random.Random(config.seed)
+    today = date.today()
+    now = datetime.now()
+    category_weights = zipf_weights(len(CATEGORIES), config.category_skew)
+    # Lower priorities are the most common
+    priority_weights = zipf_weights(len(PRIORITIES), config.priority_skew)
+
+    categories = rng.choices(CATEGORIES, category_weights, k=config.size)
+    priorities = rng.choices(PRIORITIES, priority_weights, k=config.size)
+
+    # Separate stream so the recurrence knob leaves the rest of the dataset unchanged
+    recurrence_rng = random.Random(config.seed + 1)
+    rules = ["daily", "weekly", "monthly", "every 2 weeks", "every 3 days"]
+
+    tasks = []
+    for index in range(config.size):
+        title = " ".join(rng.choices(WORDS, k=rng.randint(2, 6))).capitalize()
+        words = max(0, int(rng.expovariate(1 / config.description_words))) if config.description_words else 0
+        description = " ".join(rng.choices(WORDS, k=words))
+
+        due_date = ""
+        if rng.random() < config.due_fraction:
+            offset = rng.randint(1, config.due_spread_days)
+            if rng.random() < config.overdue_fraction:
+                offset = -offset
+            due_date = (today + timedelta(days=offset)).strftime('%Y-%m-%d')
+
+        task = Task(title, description, categories[index], priorities[index], due_date)
+        created = now - timedelta(seconds=rng.randint(0, config.history_days * 86400))
+        task.created_at = created.strftime(TIMESTAMP_FORMAT)
+        if rng.random() < config.completed_fraction:
+            task.completed = True
+            completed = created + timedelta(seconds=rng.randint(0, 30 * 86400))
+            task.completed_at = min(completed, now).strftime(TIMESTAMP_FORMAT)
+        elif due_date and recurrence_rng.random() < config.recurring_fraction:
+            task.recurrence = recurrence_rng.choice(rules)
+            task.anchor_recurrence()
+        tasks.append(task)
+
+    # Blockers are always earlier tasks, so the graph has no cycles; with the
+    # default fraction there are about as many edges as tasks
+    dependency_rng = random.Random(config.seed + 2)
+    for index in range(1, config.size):
+        if dependency_rng.random() < config.dependency_fraction:
+            count = min(index, dependency_rng.randint(1, 3))
+            tasks[index].blocked_by = [tasks[blocker].id
+                                       for blocker in dependency_rng.sample(range(index), count)]
+    return tasks
+
+
+def populate(store: TaskStore, tasks: List[Task]):
+    """Put generated tasks into a store without marking them as unsaved"""
+    store.tasks = list(tasks)
+    store._by_id = {task.id: task for task in tasks}
+    store.generation += 1
+    store._notify(None)
+
+
+class Benchmark:
+    """A named operation timed against a store of a given size"""
+
+    def __init__(self, name: str, run: Callable, setup: Optional[Callable] = None):
+        self.name = name
+        self.run = run
+        self.setup = setup
+
+
+BENCHMARKS: List[Benchmark] = []
+
+
+def benchmark(name: str, setup: Optional[Callable] = None):
+    """Register a function ``run(ctx)`` as a benchmark"""
+    def register(run):
+        BENCHMARKS.append(Benchmark(name, run, setup))
+        return run
+    return register
+
+
+# ----------------------------------------------------------------------
+# Benchmarks
+# ----------------------------------------------------------------------
+
+def clear_query_cache(ctx):
+    ctx.store.query_cache.clear()
+
+
+@benchmark("get_filtered_tasks.all", setup=clear_query_cache)
+def bench_filter_all(ctx):
+    ctx.store.query()
+
+
+@benchmark("get_filtered_tasks.category_priority", setup=clear_query_cache)
+def bench_filter_category(ctx):
+    ctx.store.query(category="Work", priority="High", status="Pending")
+
+
+@benchmark("get_filtered_tasks.search", setup=clear_query_cache)
+def bench_filter_search(ctx):
+    ctx.store.query(search="invoice")
+
+
+@benchmark("get_filtered_tasks.structured", setup=clear_query_cache)
+def bench_filter_structured(ctx):
+    ctx.store.query(search="priority:>=High category:Work due:<2026-11-01", sort=True)
+
+
+@benchmark("get_filtered_tasks.cached")
+def bench_filter_cached(ctx):
+    ctx.store.query(category="Work", status="Pending", sort=True)
+
+
+def cache_search_prefix(ctx):
+    ctx.store.query_cache.clear()
+    ctx.store.query(search="inv", sort=True)
+
+
+@benchmark("get_filtered_tasks.search_refinement", setup=cache_search_prefix)
+def bench_filter_refinement(ctx):
+    ctx.store.query(search="invoice", sort=True)
+
+
+@benchmark("refresh_task_list.rows")
+def bench_refresh_rows(ctx):
+    # The part of refresh_task_list that does not touch Tk
+    from taskmanager import task_row_values
+    ctx.store.query_cache.clear()
+    tasks = ctx.store.query(sort=True)
+    today = date.today()
+    for task in tasks:
+        task_row_values(task, today)
+
+
+def warm_row_cache(ctx):
+    from taskmanager import RowRenderCache
+    if not hasattr(ctx, 'row_cache'):
+        ctx.row_cache = RowRenderCache(ctx.store)
+    ctx.row_cache.start_refresh(date.today())
+    for task in ctx.store.query(sort=True):
+        ctx.row_cache.row(task)
+
+
+@benchmark("refresh_task_list.rows_cached", setup=warm_row_cache)
+def bench_refresh_rows_cached(ctx):
+    # A redraw after a filter change, with rows already rendered
+    ctx.row_cache.start_refresh(date.today())
+    row = ctx.row_cache.row
+    for task in ctx.store.query(category="Work", sort=True):
+        row(task)
+
+
+@benchmark("update_statistics")
+def bench_statistics(ctx):
+    ctx.store.statistics()
+
+
+@benchmark("occurrences.month")
+def bench_occurrences(ctx):
+    # Calendar-style window: recurring tasks expand into every occurrence
+    today = date.today()
+    ctx.store.occurrences(today, today + timedelta(days=30))
+
+
+def pick_busiest_blocker(ctx):
+    if not hasattr(ctx, 'busiest_blocker'):
+        dependents = ctx.store.dependencies.dependents
+        busiest = max(dependents, key=lambda task_id: len(dependents[task_id]), default=None)
+        ctx.busiest_blocker = ctx.store.get(busiest) if busiest is not None else ctx.store.tasks[0]
+
+
+@benchmark("dependencies.complete", setup=pick_busiest_blocker)
+def bench_complete_blocker(ctx):
+    # Incremental readiness update; alternates between completing and reopening
+    task = ctx.busiest_blocker
+    ctx.store.set_completed(task, not task.completed)
+
+
+@benchmark("dependencies.next_actions")
+def bench_next_actions(ctx):
+    ctx.store.dependencies.next_actions(limit=100)
+
+
+def invalidate_critical_path(ctx):
+    ctx.store.generation += 1
+
+
+@benchmark("dependencies.critical_path", setup=invalidate_critical_path)
+def bench_critical_path(ctx):
+    ctx.store.dependencies.critical_path()
+
+
+def define_saved_views(ctx):
+    # A couple of dozen views, as a heavy user might keep
+    if not len(ctx.store.views):
+        for category in CATEGORIES:
+            for priority in PRIORITIES:
+                ctx.store.views.save(f"{category} {priority}", category=category,
+                                     priority=priority, status="Pending")
+    ctx.store.query_cache.clear()
+
+
+@benchmark("views.switch", setup=define_saved_views)
+def bench_switch_view(ctx):
+    ctx.store.query(category="Work", priority="High", status="Pending", sort=True)
+
+
+@benchmark("views.edit", setup=define_saved_views)
+def bench_edit_with_views(ctx):
+    # Every change is re-tested against each materialized view
+    task = ctx.store.tasks[0]
+    ctx.store.update(task, category=CATEGORIES[(CATEGORIES.index(task.category) + 1) % len(CATEGORIES)])
+
+
+@benchmark("save_tasks.snapshot")
+def bench_save_snapshot(ctx):
+    ctx.store.save(compact=True)
+
+
+def dirty_one_task(ctx):
+    task = ctx.store.tasks[len(ctx.store.tasks) // 2]
+    ctx.store.update(task, title=task.title)
+
+
+@benchmark("save_tasks.incremental", setup=dirty_one_task)
+def bench_save_incremental(ctx):
+    ctx.store.save()
+
+
+def write_snapshot(ctx):
+    if not os.path.exists(ctx.store.data_file):
+        ctx.store.save(compact=True)
+
+
+@benchmark("load_tasks", setup=write_snapshot)
+def bench_load(ctx):
+    TaskStore(ctx.store.data_file).load()
+
+
+def write_csv(ctx):
+    if not os.path.exists(ctx.csv_file):
+        ctx.store.export_csv(ctx.csv_file)
+
+
+@benchmark("import_from_csv", setup=write_csv)
+def bench_import_csv(ctx):
+    TaskStore(os.path.join(ctx.workdir, "import.json")).import_csv(ctx.csv_file)
+
+
+@benchmark("get_productivity_metrics")
+def bench_productivity(ctx):
+    from taskmanager import TaskAnalytics
+    TaskAnalytics(SimpleNamespace(tasks=ctx.store.tasks, store=ctx.store)).get_productivity_metrics()
+
+
+def archive_history(ctx):
+    # A second copy of the dataset with its older completed tasks archived
+    if not hasattr(ctx, 'history'):
+        from taskanalytics import AnalyticsEngine
+        ctx.history = TaskStore(os.path.join(ctx.workdir, "history.json"))
+        populate(ctx.history, generate_tasks(ctx.config))
+        ctx.history.archive_completed(30)
+        ctx.analytics = AnalyticsEngine(ctx.history)
+
+
+def clear_analytics_cache(ctx):
+    archive_history(ctx)
+    ctx.analytics.clear_cache()
+
+
+@benchmark("get_productivity_metrics.archive_cold", setup=clear_analytics_cache)
+def bench_productivity_archive_cold(ctx):
+    ctx.analytics.compute()
+
+
+@benchmark("get_productivity_metrics.archive_cached", setup=archive_history)
+def bench_productivity_archive_cached(ctx):
+    ctx.analytics.compute()
+
+
+# ----------------------------------------------------------------------
+# Runner
+# ----------------------------------------------------------------------
+
+def time_benchmark(bench: Benchmark, ctx, repeat: int, measure_memory: bool) -> Dict:
+    samples = []
+    for _ in range(repeat):
+        if bench.setup:
+            bench.setup(ctx)
+        gc.collect()
+        start = time.perf_counter()
+        bench.run(ctx)
+        samples.append((time.perf_counter() - start) * 1000)
+
+    result = {
+        'median_ms': statistics.median(samples),
+        'min_ms': min(samples),
+        'max_ms': max(samples),
+        'repeat': repeat
+    }
+
+    if measure_memory:
+        # Separate run: tracing slows the code down too much to time it
+        if bench.setup:
+            bench.setup(ctx)
+        gc.collect()
+        tracemalloc.start()
+        bench.run(ctx)
+        result['peak_kib'] = tracemalloc.get_traced_memory()[1] / 1024
+        tracemalloc.stop()
+    return result
+
+
+def dataset_memory(config: DatasetConfig) -> float:
+    """KiB allocated to hold a generated dataset in memory"""
+    gc.collect()
+    tracemalloc.start()
+    tasks = generate_tasks(config)
+    size = tracemalloc.get_traced_memory()[0] / 1024
+    tracemalloc.stop()
+    del tasks
+    return size
+
+
+def run_suite(sizes: List[int], config_args: Dict, repeat: int, measure_memory: bool,
+              selected: Optional[List[str]] = None, out=sys.stdout) -> Dict:
+    results = {}
+    for size in sizes:
+        config = DatasetConfig(size, **config_args)
+        workdir = tempfile.mkdtemp(prefix="taskbench-")
+        try:
+            tasks = generate_tasks(config)
+            store = TaskStore(os.path.join(workdir, "tasks.json"))
+            populate(store, tasks)
+            ctx = SimpleNamespace(store=store, config=config, workdir=workdir,
+                                  csv_file=os.path.join(workdir, "tasks.csv"))
+
+            size_results = {}
+            if measure_memory:
+                size_results['dataset'] = {'resident_kib': dataset_memory(config)}
+            for bench in BENCHMARKS:
+                if selected and not any(bench.name.startswith(name) for name in selected):
+                    continue
+                result = time_benchmark(bench, ctx, repeat, measure_memory)
+                size_results[bench.name] = result
+                peak = f"  peak {result['peak_kib']:>10.0f} KiB" if 'peak_kib' in result else ""
+                print(f"{size:>9,}  {bench.name:<40}{result['median_ms']:>11.2f} ms{peak}", file=out)
+            results[str(size)] = size_results
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def version_info() -> Dict:
+    info = {'python': platform.python_version(), 'platform': platform.platform()}
+    try:
+        info['commit'] = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                                        cwd=os.path.dirname(os.path.abspath(__file__)),
+                                        capture_output=True, text=True, timeout=5).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        pass
+    return info
+
+
+def compare(current: Dict, baseline: Dict, threshold: float, out=sys.stdout) -> int:
+    """Print timing ratios against a baseline run and count regressions"""
+    regressions = 0
+    print(f"\nComparison with {baseline.get('version', {}).get('commit', 'baseline')} "
+          f"(regression threshold {threshold:.0%})", file=out)
+    for size, size_results in current['results'].items():
+        for name, result in size_results.items():
+            before = baseline.get('results', {}).get(size, {}).get(name, {})
+            if 'median_ms' not in result or not before.get('median_ms'):
+                continue
+            ratio = result['median_ms'] / before['median_ms']
+            flag = ""
+            if ratio > 1 + threshold:
+                flag = "  REGRESSION"
+                regressions += 1
+            print(f"{int(size):>9,}  {name:<40}{before['median_ms']:>10.2f} -> "
+                  f"{result['median_ms']:>10.2f} ms  x{ratio:.2f}{flag}", file=out)
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Task manager benchmark suite")
+    parser.add_argument('--sizes', default=",".join(str(size) for size in DEFAULT_SIZES),
+                        help="comma separated dataset sizes (e.g. 1000,100000,1000000)")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--only', default="", help="comma separated benchmark name prefixes")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--category-skew', type=float, default=1.0)
+    parser.add_argument('--priority-skew', type=float, default=0.5)
+    parser.add_argument('--completed-fraction', type=float, default=0.4)
+    parser.add_argument('--due-fraction', type=float, default=0.7)
+    parser.add_argument('--due-spread-days', type=int, default=365)
+    parser.add_argument('--overdue-fraction', type=float, default=0.2)
+    parser.add_argument('--description-words', type=int, default=30)
+    parser.add_argument('--recurring-fraction', type=float, default=0.05)
+    parser.add_argument('--dependency-fraction', type=float, default=0.5)
+    parser.add_argument('--no-memory', action='store_true', help="skip tracemalloc measurements")
+    parser.add_argument('--output', default="benchmark_results.json")
+    parser.add_argument('--compare', help="baseline results JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="slowdown ratio reported as a regression (default 0.10)")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    config_args = {
+        'seed': args.seed,
+        'category_skew': args.category_skew,
+        'priority_skew': args.priority_skew,
+        'completed_fraction': args.completed_fraction,
+        'due_fraction': args.due_fraction,
+        'due_spread_days': args.due_spread_days,
+        'overdue_fraction': args.overdue_fraction,
+        'description_words': args.description_words,
+        'recurring_fraction': args.recurring_fraction,
+        'dependency_fraction': args.dependency_fraction
+    }
+    selected = [name for name in args.only.split(',') if name]
+
+    results = run_suite(sizes, config_args, args.repeat, not args.no_memory, selected)
+    report = {
+        'version': version_info(),
+        'timestamp': datetime.now().strftime(TIMESTAMP_FORMAT),
+        'config': dict(config_args, sizes=sizes, repeat=args.repeat),
+        'results': results
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        return 1 if compare(report, baseline, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
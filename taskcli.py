@@ -0,0 +1,300 @@
+"""Command-line interface for scripting task operations without a display.
+
+Examples:
+    python taskcli.py add "Write report" -c Work -p High --due 2026-11-01
+    python taskcli.py add "Water plants" --repeat "every 3 days"
+    python taskcli.py list --status Pending --category Work
+    python taskcli.py list -s 'priority:>=High due:<2026-11-01 "invoice"' --explain
+    python taskcli.py complete 1760000000000000
+    python taskcli.py block 1760000000000000 1750000000000000
+    python taskcli.py next -n 10
+    python taskcli.py view save urgent -s 'priority:>=High status:pending'
+    python taskcli.py batch operations.txt
+    python taskcli.py archive --days 30
+"""
+
+import argparse
+import json
+import shlex
+import sys
+from typing import List, Optional
+
+from taskmetrics import metrics
+from taskstore import (Task, TaskStore, ARCHIVE_AFTER_DAYS, CATEGORIES, PRIORITIES,
+                       STATUSES, UPCOMING_DAYS, format_plan, is_overdue,
+                       validate_due_date, validate_recurrence)
+
+
+class CLIError(Exception):
+    """Raised when a command cannot be applied"""
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Create the argument parser shared by direct and batch invocations"""
+    parser = argparse.ArgumentParser(prog="taskcli", description="Headless task manager")
+    parser.add_argument('--data-file', default="tasks.json", help="task data file (default: tasks.json)")
+    parser.add_argument('--metrics-file', help="collect timings and write them to this JSON file")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    add = commands.add_parser('add', help="add a task")
+    add.add_argument('title')
+    add.add_argument('-d', '--description', default="")
+    add.add_argument('-c', '--category', default="General", choices=CATEGORIES)
+    add.add_argument('-p', '--priority', default="Medium", choices=PRIORITIES)
+    add.add_argument('--due', default="", help="due date (YYYY-MM-DD)")
+    add.add_argument('--repeat', default="",
+                     help="repeat rule: daily, weekly, monthly or 'every N days/weeks/months'")
+
+    list_cmd = commands.add_parser('list', help="list tasks")
+    list_cmd.add_argument('-s', '--search', default="",
+                          help="text, or a query such as 'priority:>=High category:Work due:<2026-11-01'")
+    list_cmd.add_argument('-c', '--category', default="All", choices=["All"] + CATEGORIES)
+    list_cmd.add_argument('-p', '--priority', default="All", choices=["All"] + PRIORITIES)
+    list_cmd.add_argument('--status', default="All", choices=STATUSES)
+    list_cmd.add_argument('-n', '--limit', type=int, default=0, help="show at most N tasks")
+    list_cmd.add_argument('--json', action='store_true', help="print tasks as JSON")
+    list_cmd.add_argument('--explain', action='store_true',
+                          help="show how the query is answered instead of the tasks")
+
+    for name, help_text in (('complete', "mark tasks as complete"),
+                            ('reopen', "mark tasks as incomplete"),
+                            ('delete', "delete tasks")):
+        cmd = commands.add_parser(name, help=help_text)
+        cmd.add_argument('ids', nargs='+', help="task IDs")
+
+    block = commands.add_parser('block', help="make a task wait for other tasks")
+    block.add_argument('id', help="the task that has to wait")
+    block.add_argument('blockers', nargs='+', help="IDs of the tasks to finish first")
+
+    unblock = commands.add_parser('unblock', help="stop a task waiting for other tasks")
+    unblock.add_argument('id')
+    unblock.add_argument('blockers', nargs='*', help="IDs to remove (default: all)")
+
+    next_cmd = commands.add_parser('next', help="list pending tasks in dependency order")
+    next_cmd.add_argument('-n', '--limit', type=int, default=20, help="show at most N tasks (default: 20)")
+    next_cmd.add_argument('--critical-path', action='store_true',
+                          help="show the longest chain of dependent tasks instead")
+
+    view = commands.add_parser('view', help="manage saved views")
+    view.add_argument('action', choices=['list', 'show', 'save', 'delete'])
+    view.add_argument('name', nargs='?', help="view name (for show, save and delete)")
+    view.add_argument('-s', '--search', default="")
+    view.add_argument('-c', '--category', default="All", choices=["All"] + CATEGORIES)
+    view.add_argument('-p', '--priority', default="All", choices=["All"] + PRIORITIES)
+    view.add_argument('--status', default="All", choices=STATUSES)
+
+    import_cmd = commands.add_parser('import', help="import tasks from a CSV file")
+    import_cmd.add_argument('filename')
+
+    export_cmd = commands.add_parser('export', help="export tasks to a CSV file")
+    export_cmd.add_argument('filename')
+
+    stats = commands.add_parser('stats', help="show task statistics")
+    stats.add_argument('--json', action='store_true', help="print statistics as JSON")
+
+    archive = commands.add_parser('archive', help="move old completed tasks to the archive")
+    archive.add_argument('--days', type=int, default=ARCHIVE_AFTER_DAYS,
+                         help=f"archive tasks completed more than N days ago (default: {ARCHIVE_AFTER_DAYS})")
+
+    batch = commands.add_parser('batch', help="apply commands from a file ('-' for stdin) in one commit")
+    batch.add_argument('filename', nargs='?', default='-')
+    batch.add_argument('--keep-going', action='store_true', help="skip failing lines instead of aborting")
+
+    return parser
+
+
+def resolve_tasks(store: TaskStore, ids: List[str]) -> List[Task]:
+    """Map task IDs to tasks, failing on unknown IDs"""
+    tasks = []
+    for task_id in ids:
+        task = store.get(task_id, include_archive=True)
+        if task is None:
+            raise CLIError(f"No task with ID {task_id}")
+        tasks.append(task)
+    return tasks
+
+
+def format_task(task: Task) -> str:
+    """Format a task as a single line of text"""
+    status = "done" if task.completed else "todo"
+    due = task.due_date or "-"
+    if task.recurrence:
+        due += f" ({task.recurrence})"
+    if is_overdue(task):
+        due += " (overdue)"
+    return f"{task.id}  [{status}]  {task.priority:<8}  {task.category:<10}  {due:<20}  {task.title}"
+
+
+def run_command(store: TaskStore, args, out=sys.stdout) -> bool:
+    """Apply one parsed command, returning True if it modified the store"""
+    if args.command == 'add':
+        if not args.title.strip():
+            raise CLIError("Task title is required!")
+        if not validate_due_date(args.due):
+            raise CLIError("Invalid date format! Use YYYY-MM-DD")
+        if not validate_recurrence(args.repeat):
+            raise CLIError(f"Unknown repeat rule: {args.repeat}")
+        task = store.add(Task(args.title.strip(), args.description, args.category,
+                              args.priority, args.due, recurrence=args.repeat))
+        print(task.id, file=out)
+        return True
+
+    if args.command == 'list' and args.explain:
+        print(format_plan(store.explain(search=args.search, category=args.category,
+                                        priority=args.priority, status=args.status)), file=out)
+        return False
+
+    if args.command == 'list':
+        tasks = store.query(search=args.search, category=args.category,
+                            priority=args.priority, status=args.status, sort=True)
+        if args.limit > 0:
+            tasks = tasks[:args.limit]
+        if args.json:
+            json.dump([task.to_dict() for task in tasks], out, indent=2)
+            out.write("\n")
+        else:
+            for task in tasks:
+                print(format_task(task), file=out)
+        return False
+
+    if args.command in ('complete', 'reopen'):
+        store.set_completed_many(resolve_tasks(store, args.ids), args.command == 'complete')
+        return True
+
+    if args.command == 'delete':
+        store.remove_many(resolve_tasks(store, args.ids))
+        return True
+
+    if args.command in ('block', 'unblock'):
+        task = resolve_tasks(store, [args.id])[0]
+        blockers = [blocker.id for blocker in resolve_tasks(store, args.blockers)]
+        if args.command == 'block':
+            blocked_by = task.blocked_by + [blocker for blocker in blockers if blocker not in task.blocked_by]
+        else:
+            blocked_by = [blocker for blocker in task.blocked_by if blockers and blocker not in blockers]
+        try:
+            store.update(task, blocked_by=blocked_by)
+        except ValueError as e:
+            raise CLIError(str(e))
+        return True
+
+    if args.command == 'next':
+        graph = store.dependencies
+        if args.critical_path:
+            tasks = graph.critical_path()
+        else:
+            tasks = graph.next_actions(limit=args.limit if args.limit > 0 else None)
+        for task in tasks:
+            marker = "blocked" if graph.is_blocked(task) else "ready"
+            print(f"{marker:<8} {format_task(task)}", file=out)
+        return False
+
+    if args.command == 'view':
+        views = store.views
+        if args.action == 'list':
+            for saved in views:
+                print(f"{views.count(saved.name):>8}  {saved.name}", file=out)
+            return False
+        if not args.name:
+            raise CLIError(f"view {args.action} needs a view name")
+        if args.action == 'show':
+            for task in views.tasks(args.name):
+                print(format_task(task), file=out)
+        elif args.action == 'save':
+            views.save(args.name, args.search, args.category, args.priority, args.status)
+        elif not views.delete(args.name):
+            raise CLIError(f"No saved view named {args.name}")
+        # Views are written to their own file as they change
+        return False
+
+    if args.command == 'import':
+        count = store.import_csv(args.filename)
+        print(f"Imported {count} tasks", file=out)
+        return count > 0
+
+    if args.command == 'export':
+        count = store.export_csv(args.filename)
+        print(f"Exported {count} tasks", file=out)
+        return False
+
+    if args.command == 'stats':
+        stats = store.statistics()
+        if args.json:
+            stats = dict(stats, overdue_tasks=[task.id for task in stats['overdue_tasks']])
+            json.dump(stats, out, indent=2)
+            out.write("\n")
+        else:
+            print(f"Total: {stats['total']}", file=out)
+            print(f"Completed: {stats['completed']}", file=out)
+            print(f"Pending: {stats['pending']}", file=out)
+            print(f"Overdue: {stats['overdue']}", file=out)
+            print(f"Completion Rate: {stats['completion_rate']:.1f}%", file=out)
+            print(f"Due in {UPCOMING_DAYS} days: {stats['upcoming']}", file=out)
+            print(f"Recurring: {stats['recurring']}", file=out)
+        return False
+
+    if args.command == 'archive':
+        if args.days <= 0:
+            raise CLIError("--days must be positive")
+        count = store.archive_completed(args.days)
+        print(f"Archived {count} tasks", file=out)
+        # archive_completed saves the store itself
+        return False
+
+    raise CLIError(f"Unknown command: {args.command}")
+
+
+def run_batch(store: TaskStore, parser: argparse.ArgumentParser, args, out=sys.stdout) -> int:
+    """Apply every command in a batch file inside one store transaction"""
+    stream = sys.stdin if args.filename == '-' else open(args.filename, 'r', encoding='utf-8')
+    failures = 0
+    try:
+        # Nothing is written until the whole batch has been applied
+        with store.batch():
+            for line_number, line in enumerate(stream, 1):
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                try:
+                    line_args = parser.parse_args(shlex.split(line))
+                    if line_args.command == 'batch':
+                        raise CLIError("Nested batch commands are not allowed")
+                    run_command(store, line_args, out)
+                except (CLIError, SystemExit, ValueError, OSError) as e:
+                    failures += 1
+                    message = f"Line {line_number}: {e if not isinstance(e, SystemExit) else 'invalid command'}"
+                    if not args.keep_going:
+                        raise CLIError(message)
+                    print(message, file=sys.stderr)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    return 1 if failures else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point for the command-line interface"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.metrics_file:
+        metrics.enabled = True
+
+    store = TaskStore(args.data_file)
+    try:
+        store.load()
+        if args.command == 'batch':
+            return run_batch(store, parser, args)
+        if run_command(store, args):
+            store.save()
+        return 0
+    except (CLIError, OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if args.metrics_file:
+            metrics.export(args.metrics_file)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
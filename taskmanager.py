@@ -1,89 +1,341 @@
+import time
+_PROCESS_START = time.perf_counter()
+
+import argparse
+import itertools
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
-from datetime import datetime, timedelta
-import json
-import os
-from typing import Dict, List, Optional
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional
 import threading
-import time
 
-class Task:
-    def __init__(self, title: str, description: str = "", category: str = "General", 
-                 priority: str = "Medium", due_date: str = "", completed: bool = False):
-        self.id = int(time.time() * 1000000)  # Unique ID based on timestamp
-        self.title = title
-        self.description = description
-        self.category = category
-        self.priority = priority
-        self.due_date = due_date
-        self.completed = completed
-        self.created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.completed_at = None
+from taskmetrics import metrics
+from taskstore import (Task, TaskStore, ARCHIVE_AFTER_DAYS, CATEGORIES, PRIORITIES,
+                       PRIORITY_ICONS, RECURRENCE_PRESETS, STATUSES, UPCOMING_DAYS, format_plan,
+                       is_overdue, task_sort_key, validate_due_date, validate_recurrence)
+
+# Time from process start to the first drawn frame that --profile-startup
+# warns about
+STARTUP_BUDGET_MS = 750
+
+# Length of the list in the Next Actions window
+NEXT_ACTIONS_SHOWN = 100
+
+# Background features start once the window is up
+NOTIFICATION_START_DELAY_MS = 2000
+
+# Calendar window: one row per week, scrollable over CALENDAR_SPAN_WEEKS
+# weeks centred on today
+CALENDAR_WEEK_HEIGHT = 120
+CALENDAR_SPAN_WEEKS = 52 * 20
+CALENDAR_ITEM_HEIGHT = 16
+CALENDAR_GUTTER = 70
+
+# Event-loop stall detection: a timer runs every LOOP_TICK_MS and any
+# callback arriving more than STALL_THRESHOLD_MS late counts as a stall
+LOOP_TICK_MS = 100
+STALL_THRESHOLD_MS = 200
+
+class StartupProfile:
+    """Records how long each startup phase takes"""
     
-    def mark_complete(self):
-        self.completed = True
-        self.completed_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    def __init__(self, started: float = _PROCESS_START):
+        self.started = started
+        self.last = started
+        self.phases = []
     
-    def mark_incomplete(self):
-        self.completed = False
-        self.completed_at = None
-    
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'title': self.title,
-            'description': self.description,
-            'category': self.category,
-            'priority': self.priority,
-            'due_date': self.due_date,
-            'completed': self.completed,
-            'created_at': self.created_at,
-            'completed_at': self.completed_at
-        }
+    def mark(self, phase: str):
+        """Close the current phase under the given name"""
+        now = time.perf_counter()
+        self.phases.append((phase, (now - self.last) * 1000))
+        self.last = now
     
-    @classmethod
-    def from_dict(cls, data: Dict):
-        task = cls(
-            title=data['title'],
-            description=data.get('description', ''),
-            category=data.get('category', 'General'),
-            priority=data.get('priority', 'Medium'),
-            due_date=data.get('due_date', ''),
-            completed=data.get('completed', False)
-        )
-        task.id = data['id']
-        task.created_at = data.get('created_at', datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
-        task.completed_at = data.get('completed_at')
-        return task
+    @property
+    def total_ms(self) -> float:
+        return (self.last - self.started) * 1000
+    
+    def report(self, budget_ms: float = STARTUP_BUDGET_MS) -> str:
+        """Format the phase timings and compare them with the budget"""
+        lines = ["STARTUP PROFILE", "=" * 40]
+        for phase, elapsed in self.phases:
+            lines.append(f"{phase:<28}{elapsed:>9.1f} ms")
+        lines.append("-" * 40)
+        lines.append(f"{'time to first frame':<28}{self.total_ms:>9.1f} ms")
+        if self.total_ms > budget_ms:
+            lines.append(f"⚠️ Over the {budget_ms:.0f} ms startup budget")
+        return "\n".join(lines)
+
+def task_row_values(task: Task, today, blocked: bool = False) -> tuple:
+    """Format a task as the value tuple of a task list row"""
+    if task.completed:
+        status = "✅ Completed"
+    else:
+        status = "⛔ Blocked" if blocked else "⏳ Pending"
+    
+    # Check if task is overdue
+    overdue = " ⚠️ OVERDUE" if is_overdue(task, today) else ""
+    repeat = " 🔁" if task.recurrence else ""
+    
+    return (
+        f"{PRIORITY_ICONS.get(task.priority, '')} {task.title}",
+        task.category,
+        task.priority,
+        task.due_date + repeat + overdue,
+        status
+    )
+
+class RowRenderCache:
+    """Pre-rendered task list rows, reused across refreshes
+    
+    A task's row is dropped when the store reports that task as changed.
+    Everything is dropped when the date rolls over, since overdue markers
+    depend on today's date. Changes can be reported from the API server
+    thread, so a missing row is rendered and stored under the cache's
+    lock; an invalidation can never land between the two.
+    """
+    
+    def __init__(self, store: TaskStore):
+        self.rows: Dict[int, tuple] = {}
+        self.day = None
+        self.dependencies = store.dependencies
+        self._lock = threading.Lock()
+        store.subscribe(self.invalidate)
+    
+    def invalidate(self, tasks, removed=False):
+        """Forget the rows of changed tasks (all rows when tasks is None)"""
+        with self._lock:
+            if tasks is None:
+                self.rows.clear()
+                return
+            for task in tasks:
+                self.rows.pop(task.id, None)
+    
+    def start_refresh(self, today):
+        """Begin a refresh on the given day"""
+        with self._lock:
+            if today != self.day:
+                self.rows.clear()
+                self.day = today
+    
+    def row(self, task: Task) -> tuple:
+        values = self.rows.get(task.id)
+        if values is None:
+            with self._lock:
+                values = self.rows[task.id] = task_row_values(task, self.day,
+                                                              self.dependencies.is_blocked(task))
+        return values
+
+class CalendarView:
+    """Calendar of open tasks by due date, one week per row, on a canvas
+    
+    The scrollbar covers years of weeks, but a redraw only asks the store
+    for the occurrences in the weeks on screen and draws just those, so
+    scrolling costs the same wherever it goes.
+    """
+    
+    def __init__(self, parent, store: TaskStore, on_open: Callable[[Task], None]):
+        self.store = store
+        self.on_open = on_open
+        today = date.today()
+        # Week 0 starts on a Monday, half the span before the current week
+        self.origin = today - timedelta(days=today.weekday(), weeks=CALENDAR_SPAN_WEEKS // 2)
+        self.top = float(CALENDAR_SPAN_WEEKS // 2)  # Week shown in the first row
+        self._generation = None
+        
+        controls = ttk.Frame(parent, style='Custom.TFrame')
+        controls.pack(fill='x', padx=10, pady=(10, 0))
+        ttk.Button(controls, text="Today", command=self.go_to_today,
+                  style='Action.TButton').pack(side='left')
+        self.month_label = ttk.Label(controls, text="", style='Heading.TLabel')
+        self.month_label.pack(side='left', padx=10)
+        
+        body = ttk.Frame(parent, style='Custom.TFrame')
+        body.pack(fill='both', expand=True, padx=10, pady=10)
+        self.header = tk.Canvas(body, height=22, bg='#34495e', highlightthickness=0)
+        self.header.pack(side='top', fill='x')
+        self.scrollbar = ttk.Scrollbar(body, orient='vertical', command=self.yview)
+        self.scrollbar.pack(side='right', fill='y')
+        self.canvas = tk.Canvas(body, bg='#ecf0f1', highlightthickness=0)
+        self.canvas.pack(side='left', fill='both', expand=True)
+        
+        self.canvas.bind('<Configure>', lambda event: self.redraw())
+        self.canvas.bind('<MouseWheel>', lambda event: self.yview('scroll', -1 if event.delta > 0 else 1, 'units'))
+        self.canvas.bind('<Button-4>', lambda event: self.yview('scroll', -1, 'units'))
+        self.canvas.bind('<Button-5>', lambda event: self.yview('scroll', 1, 'units'))
+        self.canvas.tag_bind('task', '<Double-1>', self.open_task)
+        self.watch()
+    
+    @property
+    def visible_weeks(self) -> float:
+        return max(1, self.canvas.winfo_height()) / CALENDAR_WEEK_HEIGHT
+    
+    def yview(self, *args):
+        """Scrollbar protocol: 'moveto fraction' or 'scroll n units|pages'"""
+        if args[0] == 'moveto':
+            self.top = float(args[1]) * CALENDAR_SPAN_WEEKS
+        elif args[0] == 'scroll':
+            step = self.visible_weeks if args[2] == 'pages' else 1
+            self.top += int(args[1]) * step
+        self.top = min(max(0.0, self.top), CALENDAR_SPAN_WEEKS - self.visible_weeks)
+        self.redraw()
+    
+    def go_to_today(self):
+        today = date.today()
+        self.top = float((today - self.origin).days // 7)
+        self.redraw()
+    
+    def watch(self):
+        """Redraw when the tasks change, while the window is open"""
+        if not self.canvas.winfo_exists():
+            return
+        if self.store.generation != self._generation:
+            self.redraw()
+        self.canvas.after(1000, self.watch)
+    
+    @metrics.timed("ui.calendar_redraw")
+    def redraw(self):
+        canvas = self.canvas
+        width = max(canvas.winfo_width(), 7 * 40 + CALENDAR_GUTTER)
+        column = (width - CALENDAR_GUTTER) / 7
+        today = date.today()
+        self._generation = self.store.generation
+        
+        self.header.delete('all')
+        for weekday, name in enumerate(("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")):
+            self.header.create_text(CALENDAR_GUTTER + (weekday + 0.5) * column, 11, text=name,
+                                    fill='white', font=('Arial', 10, 'bold'))
+        
+        # Only the weeks on screen are fetched and drawn
+        first_week = int(self.top)
+        last_week = min(CALENDAR_SPAN_WEEKS - 1, int(self.top + self.visible_weeks))
+        first = self.origin + timedelta(weeks=first_week)
+        last = self.origin + timedelta(weeks=last_week, days=6)
+        by_day: Dict[date, List[Task]] = {}
+        for day, task in self.store.occurrences(first, last):
+            by_day.setdefault(day, []).append(task)
+        
+        canvas.delete('all')
+        slots = (CALENDAR_WEEK_HEIGHT - 20) // CALENDAR_ITEM_HEIGHT
+        characters = max(4, int(column / 7))
+        for week in range(first_week, last_week + 1):
+            y = (week - self.top) * CALENDAR_WEEK_HEIGHT
+            monday = self.origin + timedelta(weeks=week)
+            if week == first_week or monday.day <= 7:
+                canvas.create_text(6, y + 4, anchor='nw', text=monday.strftime("%b\n%Y"),
+                                   fill='#7f8c8d', font=('Arial', 9, 'bold'))
+            for weekday in range(7):
+                day = monday + timedelta(days=weekday)
+                x = CALENDAR_GUTTER + weekday * column
+                fill = '#fdebd0' if day == today else ('#e5e8e8' if weekday >= 5 else '#fbfcfc')
+                canvas.create_rectangle(x, y, x + column, y + CALENDAR_WEEK_HEIGHT,
+                                        fill=fill, outline='#bdc3c7')
+                canvas.create_text(x + 4, y + 3, anchor='nw', font=('Arial', 9, 'bold'),
+                                   text=day.strftime("%b %d") if day.day == 1 else str(day.day),
+                                   fill='#2c3e50')
+                tasks = sorted(by_day.get(day, ()), key=task_sort_key)
+                shown = tasks if len(tasks) <= slots else tasks[:slots - 1]
+                for slot, task in enumerate(shown):
+                    label = f"{PRIORITY_ICONS.get(task.priority, '')} {task.title}"
+                    if len(label) > characters:
+                        label = label[:characters - 1] + "…"
+                    canvas.create_text(x + 4, y + 18 + slot * CALENDAR_ITEM_HEIGHT, anchor='nw',
+                                       text=label, font=('Arial', 9),
+                                       fill='#c0392b' if day < today else '#2c3e50',
+                                       tags=('task', f"task:{task.id}"))
+                if len(shown) < len(tasks):
+                    canvas.create_text(x + 4, y + 18 + len(shown) * CALENDAR_ITEM_HEIGHT, anchor='nw',
+                                       text=f"+{len(tasks) - len(shown)} more", font=('Arial', 9, 'italic'),
+                                       fill='#7f8c8d')
+        
+        self.month_label.config(text=(self.origin + timedelta(weeks=round(self.top))).strftime("%B %Y"))
+        self.scrollbar.set(self.top / CALENDAR_SPAN_WEEKS,
+                           (self.top + self.visible_weeks) / CALENDAR_SPAN_WEEKS)
+    
+    def open_task(self, event):
+        for tag in self.canvas.gettags('current'):
+            if tag.startswith("task:"):
+                task = self.store.get(tag[5:])
+                if task is not None:
+                    self.on_open(task)
+                return
 
 class AdvancedTaskManager:
-    def __init__(self, root):
+    def __init__(self, root, startup: Optional[StartupProfile] = None):
+        self.startup = startup or StartupProfile()
         self.root = root
         self.root.title("Advanced Task Manager")
         self.root.geometry("1200x800")
         self.root.configure(bg='#2c3e50')
         
         # Data storage
-        self.tasks: List[Task] = []
-        self.categories = ["General", "Work", "Personal", "Health", "Education", "Finance"]
-        self.priorities = ["Low", "Medium", "High", "Critical"]
+        self.categories = list(CATEGORIES)
+        self.priorities = list(PRIORITIES)
         self.data_file = "tasks.json"
+        self.store = TaskStore(self.data_file)
+        self.row_cache = RowRenderCache(self.store)
+        
+        # Secondary components are created on first use
+        self._notifications = None
+        self._import_export = None
+        self._analytics = None
         
         # Load existing tasks
         self.load_tasks()
+        self.startup.mark("load tasks")
         
         # Create GUI
         self.create_styles()
         self.create_widgets()
+        self.startup.mark("create widgets")
         self.refresh_task_list()
+        self.startup.mark("first refresh")
         
         # Auto-save every 30 seconds
         self.auto_save_thread = threading.Thread(target=self.auto_save_loop, daemon=True)
         self.auto_save_thread.start()
         
+        # Due date reminders are not needed before the window is shown
+        self.root.after(NOTIFICATION_START_DELAY_MS, self.start_notifications)
+        self.root.after(NOTIFICATION_START_DELAY_MS, self.archive_old_tasks)
+        
+        # Measure event-loop responsiveness for the diagnostics window
+        self.watch_event_loop()
+        
+        # Pick up changes made by the API server or other instances
+        self.root.after(1000, self.watch_store)
+        
+        # Undo and redo shortcuts
+        self.root.bind('<Control-z>', lambda event: self.undo())
+        self.root.bind('<Control-y>', lambda event: self.redo())
+        self.root.bind('<Control-Shift-Z>', lambda event: self.redo())
+        
         # Bind close event
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
     
+    @property
+    def tasks(self) -> List[Task]:
+        """Tasks currently held by the store"""
+        return self.store.tasks
+    
+    @property
+    def import_export(self) -> 'TaskImportExport':
+        """CSV import/export helper, created on first use"""
+        if self._import_export is None:
+            self._import_export = TaskImportExport(self)
+        return self._import_export
+    
+    @property
+    def analytics(self) -> 'TaskAnalytics':
+        """Analytics engine, created on first use"""
+        if self._analytics is None:
+            self._analytics = TaskAnalytics(self)
+        return self._analytics
+    
+    def start_notifications(self):
+        """Start the due date notification thread if it is not running yet"""
+        if self._notifications is None:
+            self._notifications = TaskNotificationSystem(self)
+    
     def create_styles(self):
         """Create custom styles for the application"""
         style = ttk.Style()
@@ -183,6 +435,12 @@ class AdvancedTaskManager:
         self.due_date_entry = ttk.Entry(input_frame, width=30, font=('Arial', 10))
         self.due_date_entry.pack(fill='x', pady=2)
         
+        # Repeat rule (presets, or typed as "every N days/weeks/months")
+        ttk.Label(input_frame, text="Repeat:", style='Heading.TLabel').pack(anchor='w')
+        self.repeat_combo = ttk.Combobox(input_frame, values=RECURRENCE_PRESETS, font=('Arial', 10))
+        self.repeat_combo.set("Never")
+        self.repeat_combo.pack(fill='x', pady=2)
+        
         # Add task button
         ttk.Button(input_frame, text="➕ Add Task", 
                   command=self.add_task, style='Success.TButton').pack(pady=10)
@@ -204,16 +462,32 @@ class AdvancedTaskManager:
         ttk.Button(control_frame, text="🗑️ Delete Task", 
                   command=self.delete_task, style='Danger.TButton').pack(fill='x', pady=2)
         
+        history_frame = ttk.Frame(control_frame, style='Custom.TFrame')
+        history_frame.pack(fill='x', pady=2)
+        ttk.Button(history_frame, text="↶ Undo", command=self.undo,
+                  style='Action.TButton').pack(side='left', fill='x', expand=True, padx=(0, 2))
+        ttk.Button(history_frame, text="↷ Redo", command=self.redo,
+                  style='Action.TButton').pack(side='left', fill='x', expand=True, padx=(2, 0))
+        
         # Filter section
         filter_frame = ttk.LabelFrame(left_frame, text="Filters", 
                                      style='Custom.TFrame')
         filter_frame.pack(fill='x', pady=5)
         
         # Search
-        ttk.Label(filter_frame, text="Search:", style='Heading.TLabel').pack(anchor='w')
-        self.search_entry = ttk.Entry(filter_frame, width=30, font=('Arial', 10))
-        self.search_entry.pack(fill='x', pady=2)
+        ttk.Label(filter_frame, text="Search (text or query):", style='Heading.TLabel').pack(anchor='w')
+        search_row = ttk.Frame(filter_frame, style='Custom.TFrame')
+        search_row.pack(fill='x', pady=2)
+        self.search_entry = ttk.Entry(search_row, width=26, font=('Arial', 10))
+        self.search_entry.pack(side='left', fill='x', expand=True)
         self.search_entry.bind('<KeyRelease>', self.on_search_change)
+        ttk.Button(search_row, text="🔎", width=3, command=self.show_query_plan,
+                  style='Action.TButton').pack(side='left', padx=(2, 0))
+        
+        # Problems with a query such as priority:>=High due:<2026-11-01
+        self.query_error_label = ttk.Label(filter_frame, text="", style='Heading.TLabel',
+                                           foreground='#e74c3c', wraplength=220)
+        self.query_error_label.pack(anchor='w')
         
         # Filter by category
         ttk.Label(filter_frame, text="Filter by Category:", style='Heading.TLabel').pack(anchor='w')
@@ -236,12 +510,31 @@ class AdvancedTaskManager:
         # Filter by status
         ttk.Label(filter_frame, text="Filter by Status:", style='Heading.TLabel').pack(anchor='w')
         self.filter_status = ttk.Combobox(filter_frame, 
-                                         values=["All", "Completed", "Pending"], 
+                                         values=STATUSES, 
                                          state='readonly', font=('Arial', 10))
         self.filter_status.set("All")
         self.filter_status.pack(fill='x', pady=2)
         self.filter_status.bind('<<ComboboxSelected>>', self.on_filter_change)
         
+        # Saved views, each with a live count badge
+        views_frame = ttk.LabelFrame(left_frame, text="Saved Views", 
+                                    style='Custom.TFrame')
+        views_frame.pack(fill='x', pady=5)
+        
+        self.views_listbox = tk.Listbox(views_frame, height=5, font=('Arial', 10),
+                                        bg='#ecf0f1', fg='#2c3e50', activestyle='none',
+                                        exportselection=False)
+        self.views_listbox.pack(fill='x', pady=2)
+        self.views_listbox.bind('<<ListboxSelect>>', self.apply_saved_view)
+        self.views_listbox.bind('<Delete>', lambda event: self.delete_saved_view())
+        
+        views_buttons = ttk.Frame(views_frame, style='Custom.TFrame')
+        views_buttons.pack(fill='x', pady=2)
+        ttk.Button(views_buttons, text="💾 Save Current", command=self.save_current_view,
+                  style='Action.TButton').pack(side='left', fill='x', expand=True, padx=(0, 2))
+        ttk.Button(views_buttons, text="🗑️ Remove", command=self.delete_saved_view,
+                  style='Danger.TButton').pack(side='left', fill='x', expand=True, padx=(2, 0))
+        
         # Statistics section
         stats_frame = ttk.LabelFrame(left_frame, text="Statistics", 
                                     style='Custom.TFrame')
@@ -262,7 +555,7 @@ class AdvancedTaskManager:
         # Create treeview
         self.tree = ttk.Treeview(list_frame, style='Custom.Treeview', 
                                 columns=('Title', 'Category', 'Priority', 'Due Date', 'Status'),
-                                show='headings', height=20)
+                                show='headings', height=20, selectmode='extended')
         
         # Define headings
         self.tree.heading('Title', text='Title')
@@ -289,6 +582,9 @@ class AdvancedTaskManager:
         # Bind double-click to show details
         self.tree.bind('<Double-1>', self.show_task_details)
         
+        # Shift/Ctrl-click select several tasks for bulk operations
+        self.tree.bind('<Control-a>', self.select_all_tasks)
+        
         # Bottom buttons
         bottom_frame = ttk.Frame(right_frame, style='Custom.TFrame')
         bottom_frame.pack(fill='x', pady=5)
@@ -301,6 +597,28 @@ class AdvancedTaskManager:
         
         ttk.Button(bottom_frame, text="🔄 Refresh", 
                   command=self.refresh_task_list, style='Action.TButton').pack(side='left', padx=5)
+        
+        # Import/export and analytics buttons
+        extra_buttons_frame = ttk.Frame(self.root, style='Custom.TFrame')
+        extra_buttons_frame.pack(fill='x', padx=20, pady=5)
+        
+        ttk.Button(extra_buttons_frame, text="📥 Import CSV", 
+                  command=self.import_csv, style='Action.TButton').pack(side='left', padx=5)
+        
+        ttk.Button(extra_buttons_frame, text="📤 Export CSV", 
+                  command=self.export_csv, style='Action.TButton').pack(side='left', padx=5)
+        
+        ttk.Button(extra_buttons_frame, text="📊 Analytics", 
+                  command=self.show_analytics, style='Action.TButton').pack(side='left', padx=5)
+        
+        ttk.Button(extra_buttons_frame, text="⏭️ Next Actions", 
+                  command=self.show_next_actions, style='Action.TButton').pack(side='left', padx=5)
+        
+        ttk.Button(extra_buttons_frame, text="📅 Calendar", 
+                  command=self.show_calendar, style='Action.TButton').pack(side='left', padx=5)
+        
+        ttk.Button(extra_buttons_frame, text="🩺 Diagnostics", 
+                  command=self.show_diagnostics, style='Action.TButton').pack(side='left', padx=5)
     
     def add_task(self):
         """Add a new task"""
@@ -313,17 +631,17 @@ class AdvancedTaskManager:
         category = self.category_combo.get()
         priority = self.priority_combo.get()
         due_date = self.due_date_entry.get().strip()
+        recurrence = self.repeat_combo.get().strip()
         
         # Validate due date format
-        if due_date:
-            try:
-                datetime.strptime(due_date, '%Y-%m-%d')
-            except ValueError:
-                messagebox.showerror("Error", "Invalid date format! Use YYYY-MM-DD")
-                return
+        if not validate_due_date(due_date):
+            messagebox.showerror("Error", "Invalid date format! Use YYYY-MM-DD")
+            return
+        if not validate_recurrence(recurrence):
+            messagebox.showerror("Error", "Invalid repeat rule! Use daily, weekly, monthly or every N days/weeks/months")
+            return
         
-        task = Task(title, description, category, priority, due_date)
-        self.tasks.append(task)
+        self.store.add(Task(title, description, category, priority, due_date, recurrence=recurrence))
         
         # Clear input fields
         self.title_entry.delete(0, tk.END)
@@ -331,6 +649,7 @@ class AdvancedTaskManager:
         self.category_combo.set("General")
         self.priority_combo.set("Medium")
         self.due_date_entry.delete(0, tk.END)
+        self.repeat_combo.set("Never")
         
         self.refresh_task_list()
         self.save_tasks()
@@ -343,43 +662,64 @@ class AdvancedTaskManager:
             messagebox.showwarning("Warning", "Please select a task first!")
             return None
         
-        item = self.tree.item(selection[0])
-        task_id = item['values'][0] if item['values'] else None
-        
-        for task in self.tasks:
-            if str(task.id) == str(task_id):
-                return task
-        
-        return None
+        # Rows are inserted with the task ID as their item ID
+        return self.store.get(selection[0], include_archive=True)
+    
+    def get_selected_tasks(self) -> List[Task]:
+        """Get every selected task"""
+        selection = self.tree.selection()
+        if not selection:
+            messagebox.showwarning("Warning", "Please select a task first!")
+            return []
+        get = self.store.get
+        return [task for task in (get(item, include_archive=True) for item in selection) if task]
+    
+    def select_all_tasks(self, event=None):
+        """Select every task in the list"""
+        self.tree.selection_set(self.tree.get_children())
+        return 'break'
     
     def mark_complete(self):
-        """Mark selected task as complete"""
-        task = self.get_selected_task()
-        if task:
-            task.mark_complete()
+        """Mark selected tasks as complete"""
+        tasks = self.get_selected_tasks()
+        if tasks:
+            # One store change, one refresh and one save however many are selected
+            self.store.set_completed_many(tasks, True)
             self.refresh_task_list()
             self.save_tasks()
-            messagebox.showinfo("Success", "Task marked as complete!")
+            if len(tasks) > 1:
+                messagebox.showinfo("Success", f"{len(tasks)} tasks marked as complete!")
+            elif tasks[0].recurrence:
+                messagebox.showinfo("Success", f"Occurrence completed! Next due {tasks[0].due_date}")
+            else:
+                messagebox.showinfo("Success", "Task marked as complete!")
     
     def mark_incomplete(self):
-        """Mark selected task as incomplete"""
-        task = self.get_selected_task()
-        if task:
-            task.mark_incomplete()
+        """Mark selected tasks as incomplete"""
+        tasks = self.get_selected_tasks()
+        if tasks:
+            self.store.set_completed_many(tasks, False)
             self.refresh_task_list()
             self.save_tasks()
-            messagebox.showinfo("Success", "Task marked as incomplete!")
+            if len(tasks) > 1:
+                messagebox.showinfo("Success", f"{len(tasks)} tasks marked as incomplete!")
+            else:
+                messagebox.showinfo("Success", "Task marked as incomplete!")
     
     def edit_task(self):
-        """Edit selected task"""
-        task = self.get_selected_task()
-        if not task:
+        """Edit selected task, or the shared fields of several selected tasks"""
+        tasks = self.get_selected_tasks()
+        if not tasks:
+            return
+        if len(tasks) > 1:
+            self.edit_tasks(tasks)
             return
+        task = tasks[0]
         
         # Create edit window
         edit_window = tk.Toplevel(self.root)
         edit_window.title("Edit Task")
-        edit_window.geometry("400x500")
+        edit_window.geometry("400x620")
         edit_window.configure(bg='#2c3e50')
         edit_window.grab_set()
         
@@ -413,6 +753,19 @@ class AdvancedTaskManager:
         due_date_entry.insert(0, task.due_date)
         due_date_entry.pack(fill='x', padx=10, pady=2)
         
+        # Repeat rule
+        ttk.Label(edit_window, text="Repeat:", style='Heading.TLabel').pack(anchor='w', padx=10, pady=5)
+        repeat_combo = ttk.Combobox(edit_window, values=RECURRENCE_PRESETS, font=('Arial', 10))
+        repeat_combo.set(task.recurrence or "Never")
+        repeat_combo.pack(fill='x', padx=10, pady=2)
+        
+        # Tasks that must be completed first
+        ttk.Label(edit_window, text="Blocked By (task IDs, comma separated):", 
+                 style='Heading.TLabel').pack(anchor='w', padx=10, pady=5)
+        blocked_by_entry = ttk.Entry(edit_window, width=40, font=('Arial', 10))
+        blocked_by_entry.insert(0, ", ".join(str(blocker) for blocker in task.blocked_by))
+        blocked_by_entry.pack(fill='x', padx=10, pady=2)
+        
         def save_changes():
             new_title = title_entry.get().strip()
             if not new_title:
@@ -420,18 +773,28 @@ class AdvancedTaskManager:
                 return
             
             new_due_date = due_date_entry.get().strip()
-            if new_due_date:
-                try:
-                    datetime.strptime(new_due_date, '%Y-%m-%d')
-                except ValueError:
-                    messagebox.showerror("Error", "Invalid date format! Use YYYY-MM-DD")
-                    return
+            if not validate_due_date(new_due_date):
+                messagebox.showerror("Error", "Invalid date format! Use YYYY-MM-DD")
+                return
+            
+            new_recurrence = repeat_combo.get().strip()
+            if not validate_recurrence(new_recurrence):
+                messagebox.showerror("Error", "Invalid repeat rule! Use daily, weekly, monthly or every N days/weeks/months")
+                return
             
-            task.title = new_title
-            task.description = desc_text.get(1.0, tk.END).strip()
-            task.category = category_combo.get()
-            task.priority = priority_combo.get()
-            task.due_date = new_due_date
+            blocked_by = [part.strip() for part in blocked_by_entry.get().split(',') if part.strip()]
+            try:
+                self.store.update(task,
+                                  title=new_title,
+                                  description=desc_text.get(1.0, tk.END).strip(),
+                                  category=category_combo.get(),
+                                  priority=priority_combo.get(),
+                                  due_date=new_due_date,
+                                  recurrence=new_recurrence,
+                                  blocked_by=blocked_by)
+            except ValueError as e:
+                messagebox.showerror("Error", f"Invalid blocking tasks: {e}")
+                return
             
             self.refresh_task_list()
             self.save_tasks()
@@ -448,24 +811,109 @@ class AdvancedTaskManager:
         ttk.Button(button_frame, text="Cancel", command=edit_window.destroy, 
                   style='Danger.TButton').pack(side='right', padx=5)
     
+    def edit_tasks(self, tasks: List[Task]):
+        """Change category, priority or due date of several tasks at once"""
+        unchanged = "(unchanged)"
+        edit_window = tk.Toplevel(self.root)
+        edit_window.title(f"Edit {len(tasks)} Tasks")
+        edit_window.geometry("400x320")
+        edit_window.configure(bg='#2c3e50')
+        edit_window.grab_set()
+        
+        # Category
+        ttk.Label(edit_window, text="Category:", style='Heading.TLabel').pack(anchor='w', padx=10, pady=5)
+        category_combo = ttk.Combobox(edit_window, values=[unchanged] + self.categories,
+                                      state='readonly', font=('Arial', 10))
+        category_combo.set(unchanged)
+        category_combo.pack(fill='x', padx=10, pady=2)
+        
+        # Priority
+        ttk.Label(edit_window, text="Priority:", style='Heading.TLabel').pack(anchor='w', padx=10, pady=5)
+        priority_combo = ttk.Combobox(edit_window, values=[unchanged] + self.priorities,
+                                      state='readonly', font=('Arial', 10))
+        priority_combo.set(unchanged)
+        priority_combo.pack(fill='x', padx=10, pady=2)
+        
+        # Due date
+        ttk.Label(edit_window, text="Due Date (YYYY-MM-DD, blank to keep):",
+                 style='Heading.TLabel').pack(anchor='w', padx=10, pady=5)
+        due_date_entry = ttk.Entry(edit_window, width=40, font=('Arial', 10))
+        due_date_entry.pack(fill='x', padx=10, pady=2)
+        
+        def save_changes():
+            fields = {}
+            if category_combo.get() != unchanged:
+                fields['category'] = category_combo.get()
+            if priority_combo.get() != unchanged:
+                fields['priority'] = priority_combo.get()
+            new_due_date = due_date_entry.get().strip()
+            if new_due_date:
+                if not validate_due_date(new_due_date):
+                    messagebox.showerror("Error", "Invalid date format! Use YYYY-MM-DD")
+                    return
+                fields['due_date'] = new_due_date
+            if fields:
+                self.store.update_many(tasks, **fields)
+                self.refresh_task_list()
+                self.save_tasks()
+            edit_window.destroy()
+            if fields:
+                messagebox.showinfo("Success", f"{len(tasks)} tasks updated successfully!")
+        
+        # Buttons
+        button_frame = ttk.Frame(edit_window, style='Custom.TFrame')
+        button_frame.pack(fill='x', padx=10, pady=20)
+        
+        ttk.Button(button_frame, text="Save Changes", command=save_changes, 
+                  style='Success.TButton').pack(side='left', padx=5)
+        
+        ttk.Button(button_frame, text="Cancel", command=edit_window.destroy, 
+                  style='Danger.TButton').pack(side='right', padx=5)
+    
     def delete_task(self):
-        """Delete selected task"""
-        task = self.get_selected_task()
-        if not task:
+        """Delete selected tasks"""
+        tasks = self.get_selected_tasks()
+        if not tasks:
             return
         
-        if messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete '{task.title}'?"):
-            self.tasks.remove(task)
+        if len(tasks) == 1:
+            question = f"Are you sure you want to delete '{tasks[0].title}'?"
+        else:
+            question = f"Are you sure you want to delete {len(tasks)} tasks?"
+        if messagebox.askyesno("Confirm Delete", question):
+            self.store.remove_many(tasks)
             self.refresh_task_list()
             self.save_tasks()
-            messagebox.showinfo("Success", "Task deleted successfully!")
+            if len(tasks) == 1:
+                messagebox.showinfo("Success", "Task deleted successfully!")
+            else:
+                messagebox.showinfo("Success", f"{len(tasks)} tasks deleted successfully!")
+    
+    def undo(self):
+        """Revert the most recent change"""
+        if self.store.undo() is None:
+            self.root.bell()
+            return
+        self.refresh_task_list()
+        self.save_tasks()
+    
+    def redo(self):
+        """Apply the most recently undone change again"""
+        if self.store.redo() is None:
+            self.root.bell()
+            return
+        self.refresh_task_list()
+        self.save_tasks()
     
     def show_task_details(self, event):
         """Show detailed view of selected task"""
         task = self.get_selected_task()
         if not task:
             return
-        
+        self.show_details_for(task)
+    
+    def show_details_for(self, task: Task):
+        """Show detailed view of a task"""
         # Create details window
         details_window = tk.Toplevel(self.root)
         details_window.title(f"Task Details - {task.title}")
@@ -478,6 +926,19 @@ class AdvancedTaskManager:
                              bg='#ecf0f1', fg='#2c3e50', padx=20, pady=20)
         text_widget.pack(fill='both', expand=True, padx=20, pady=20)
         
+        # Upcoming occurrences are computed from the rule, not stored
+        repeat_details = ""
+        if task.recurrence:
+            today = date.today()
+            upcoming = [day.strftime('%Y-%m-%d') for day in
+                        itertools.islice(task.occurrences(today, today + timedelta(days=366)), 5)]
+            repeat_details = f"\nRepeats: {task.recurrence}\nUpcoming: {', '.join(upcoming) or 'None'}\n"
+        
+        blockers = self.store.dependencies.open_blockers_of(task)
+        blocker_details = ""
+        if blockers:
+            blocker_details = "\nWaiting For: " + ", ".join(blocker.title for blocker in blockers) + "\n"
+        
         # Format task details
         details = f"""TASK DETAILS
 {'='*50}
@@ -491,7 +952,7 @@ Category: {task.category}
 Priority: {task.priority}
 
 Due Date: {task.due_date if task.due_date else 'No due date'}
-
+{repeat_details}{blocker_details}
 Status: {'✅ Completed' if task.completed else '⏳ Pending'}
 
 Created: {task.created_at}
@@ -508,108 +969,148 @@ Task ID: {task.id}
         """Handle search input change"""
         self.refresh_task_list()
     
+    def update_view_badges(self):
+        """Show every saved view with its current number of tasks"""
+        listbox = self.views_listbox
+        selection = listbox.curselection()
+        self.store.views.refresh()
+        names = []
+        entries = []
+        for view in self.store.views:
+            try:
+                count = self.store.views.count(view.name)
+            except ValueError:
+                count = "?"
+            names.append(view.name)
+            entries.append(f"{view.name}  ({count})")
+        if list(listbox.get(0, tk.END)) != entries:
+            listbox.delete(0, tk.END)
+            listbox.insert(tk.END, *entries)
+            for index in selection:
+                if index < len(entries):
+                    listbox.selection_set(index)
+        self._view_names = names
+    
+    def apply_saved_view(self, event=None):
+        """Show the tasks of the selected saved view"""
+        selection = self.views_listbox.curselection()
+        if not selection:
+            return
+        view = self.store.views.get(self._view_names[selection[0]])
+        if view is None:
+            return
+        self.search_entry.delete(0, tk.END)
+        self.search_entry.insert(0, view.search)
+        self.filter_category.set(view.category)
+        self.filter_priority.set(view.priority)
+        self.filter_status.set(view.status)
+        # The store answers this query from the view's maintained result
+        self.refresh_task_list()
+    
+    def save_current_view(self):
+        """Save the current search and filters as a named view"""
+        name = simpledialog.askstring("Save View", "Name for this view:", parent=self.root)
+        if not name:
+            return
+        try:
+            self.store.views.save(name,
+                                  search=self.search_entry.get(),
+                                  category=self.filter_category.get(),
+                                  priority=self.filter_priority.get(),
+                                  status=self.filter_status.get())
+        except (ValueError, OSError) as e:
+            messagebox.showerror("Error", f"Could not save view: {e}")
+            return
+        self.update_view_badges()
+    
+    def delete_saved_view(self):
+        """Remove the selected saved view"""
+        selection = self.views_listbox.curselection()
+        if not selection:
+            messagebox.showwarning("Warning", "Please select a view first!")
+            return
+        name = self._view_names[selection[0]]
+        if messagebox.askyesno("Confirm Delete", f"Remove the saved view '{name}'?"):
+            self.store.views.delete(name)
+            self.update_view_badges()
+    
     def on_filter_change(self, event):
         """Handle filter change"""
         self.refresh_task_list()
     
-    def get_filtered_tasks(self) -> List[Task]:
-        """Get tasks based on current filters"""
-        filtered_tasks = self.tasks.copy()
-        
-        # Search filter
-        search_term = self.search_entry.get().lower()
-        if search_term:
-            filtered_tasks = [task for task in filtered_tasks 
-                            if search_term in task.title.lower() or 
-                            search_term in task.description.lower()]
-        
-        # Category filter
-        category_filter = self.filter_category.get()
-        if category_filter != "All":
-            filtered_tasks = [task for task in filtered_tasks 
-                            if task.category == category_filter]
-        
-        # Priority filter
-        priority_filter = self.filter_priority.get()
-        if priority_filter != "All":
-            filtered_tasks = [task for task in filtered_tasks 
-                            if task.priority == priority_filter]
-        
-        # Status filter
-        status_filter = self.filter_status.get()
-        if status_filter == "Completed":
-            filtered_tasks = [task for task in filtered_tasks if task.completed]
-        elif status_filter == "Pending":
-            filtered_tasks = [task for task in filtered_tasks if not task.completed]
-        
-        return filtered_tasks
+    @metrics.timed("ui.get_filtered_tasks")
+    def get_filtered_tasks(self) -> Optional[List[Task]]:
+        """Get tasks based on current filters, or None if the query is invalid"""
+        try:
+            tasks = self.store.query(search=self.search_entry.get(),
+                                     category=self.filter_category.get(),
+                                     priority=self.filter_priority.get(),
+                                     status=self.filter_status.get(),
+                                     sort=True)
+        except ValueError as e:
+            self.query_error_label.config(text=str(e))
+            return None
+        self.query_error_label.config(text="")
+        return tasks
     
+    def show_query_plan(self):
+        """Explain how the current search and filters are answered"""
+        try:
+            steps = self.store.explain(search=self.search_entry.get(),
+                                       category=self.filter_category.get(),
+                                       priority=self.filter_priority.get(),
+                                       status=self.filter_status.get())
+        except ValueError as e:
+            messagebox.showerror("Error", f"Invalid query: {e}")
+            return
+        
+        window = tk.Toplevel(self.root)
+        window.title("Query Plan")
+        window.geometry("700x300")
+        window.configure(bg='#2c3e50')
+        
+        text_widget = tk.Text(window, wrap=tk.NONE, font=('Courier', 10), 
+                             bg='#ecf0f1', fg='#2c3e50', padx=20, pady=20)
+        text_widget.pack(fill='both', expand=True, padx=20, pady=20)
+        text_widget.insert(1.0, format_plan(steps))
+        text_widget.config(state='disabled')
+    
+    @metrics.timed("ui.refresh_task_list")
     def refresh_task_list(self):
         """Refresh the task list display"""
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        generation = self.store.generation
         
-        # Get filtered tasks
+        # Get filtered tasks, sorted by priority and due date; an unfinished
+        # query leaves the current rows in place
         filtered_tasks = self.get_filtered_tasks()
+        if filtered_tasks is None:
+            return
+        self._rendered_generation = generation
         
-        # Sort tasks by priority and due date
-        priority_order = {"Critical": 0, "High": 1, "Medium": 2, "Low": 3}
-        filtered_tasks.sort(key=lambda x: (
-            x.completed,  # Completed tasks go last
-            priority_order.get(x.priority, 4),  # Sort by priority
-            x.due_date if x.due_date else "9999-12-31"  # Sort by due date
-        ))
+        # Clear existing items
+        self.tree.delete(*self.tree.get_children())
         
-        # Add tasks to treeview
+        # Add tasks to treeview, reusing rows rendered by earlier refreshes
+        self.row_cache.start_refresh(datetime.now().date())
+        row = self.row_cache.row
+        insert = self.tree.insert
         for task in filtered_tasks:
-            status = "✅ Completed" if task.completed else "⏳ Pending"
-            priority_icon = {"Critical": "🔴", "High": "🟠", "Medium": "🟡", "Low": "🟢"}
-            
-            # Check if task is overdue
-            overdue = ""
-            if task.due_date and not task.completed:
-                try:
-                    due_date = datetime.strptime(task.due_date, '%Y-%m-%d')
-                    if due_date.date() < datetime.now().date():
-                        overdue = " ⚠️ OVERDUE"
-                except ValueError:
-                    pass
-            
-            self.tree.insert('', 'end', values=(
-                task.id,  # Hidden ID for reference
-                f"{priority_icon.get(task.priority, '')} {task.title}",
-                task.category,
-                task.priority,
-                task.due_date + overdue,
-                status
-            ))
-        
-        # Update statistics
+            insert('', 'end', iid=task.id, values=row(task))
+        
+        # Update statistics and the saved view counts
         self.update_statistics()
+        self.update_view_badges()
     
     def update_statistics(self):
         """Update statistics display"""
-        total_tasks = len(self.tasks)
-        completed_tasks = len([task for task in self.tasks if task.completed])
-        pending_tasks = total_tasks - completed_tasks
-        
-        # Calculate overdue tasks
-        overdue_tasks = 0
-        for task in self.tasks:
-            if task.due_date and not task.completed:
-                try:
-                    due_date = datetime.strptime(task.due_date, '%Y-%m-%d')
-                    if due_date.date() < datetime.now().date():
-                        overdue_tasks += 1
-                except ValueError:
-                    pass
+        stats = self.store.statistics()
         
         stats_text = f"""📊 Statistics
-Total: {total_tasks}
-Completed: {completed_tasks}
-Pending: {pending_tasks}
-Overdue: {overdue_tasks}"""
+Total: {stats['total']}
+Completed: {stats['completed']}
+Pending: {stats['pending']}
+Overdue: {stats['overdue']}
+Due in {UPCOMING_DAYS} days: {stats['upcoming']}"""
         
         self.stats_label.config(text=stats_text)
     
@@ -627,65 +1128,39 @@ Overdue: {overdue_tasks}"""
         text_widget.pack(fill='both', expand=True, padx=20, pady=20)
         
         # Calculate detailed statistics
-        total_tasks = len(self.tasks)
-        completed_tasks = len([task for task in self.tasks if task.completed])
-        pending_tasks = total_tasks - completed_tasks
-        
-        # Category breakdown
-        category_stats = {}
-        for task in self.tasks:
-            if task.category not in category_stats:
-                category_stats[task.category] = {'total': 0, 'completed': 0}
-            category_stats[task.category]['total'] += 1
-            if task.completed:
-                category_stats[task.category]['completed'] += 1
-        
-        # Priority breakdown
-        priority_stats = {}
-        for task in self.tasks:
-            if task.priority not in priority_stats:
-                priority_stats[task.priority] = {'total': 0, 'completed': 0}
-            priority_stats[task.priority]['total'] += 1
-            if task.completed:
-                priority_stats[task.priority]['completed'] += 1
-        
-        # Overdue tasks
-        overdue_tasks = []
-        for task in self.tasks:
-            if task.due_date and not task.completed:
-                try:
-                    due_date = datetime.strptime(task.due_date, '%Y-%m-%d')
-                    if due_date.date() < datetime.now().date():
-                        overdue_tasks.append(task)
-                except ValueError:
-                    pass
+        stats = self.store.statistics()
+        category_stats = stats['category_breakdown']
+        priority_stats = stats['priority_breakdown']
+        overdue_tasks = stats['overdue_tasks']
         
         # Format statistics
         stats_text = f"""DETAILED STATISTICS
 {'='*60}
 
 OVERVIEW
-Total Tasks: {total_tasks}
-Completed Tasks: {completed_tasks}
-Pending Tasks: {pending_tasks}
-Completion Rate: {(completed_tasks/total_tasks*100):.1f}% if total_tasks > 0 else 0.0%
+Total Tasks: {stats['total']}
+Completed Tasks: {stats['completed']}
+Pending Tasks: {stats['pending']}
+Completion Rate: {stats['completion_rate']:.1f}%
+Recurring Tasks: {stats['recurring']}
+Due in the Next {UPCOMING_DAYS} Days: {stats['upcoming']}
 
 CATEGORY BREAKDOWN
 {'-'*30}
 """
         
-        for category, stats in category_stats.items():
-            completion_rate = (stats['completed']/stats['total']*100) if stats['total'] > 0 else 0
-            stats_text += f"{category}: {stats['completed']}/{stats['total']} ({completion_rate:.1f}%)\n"
+        for category, breakdown in category_stats.items():
+            completion_rate = (breakdown['completed']/breakdown['total']*100) if breakdown['total'] > 0 else 0
+            stats_text += f"{category}: {breakdown['completed']}/{breakdown['total']} ({completion_rate:.1f}%)\n"
         
         stats_text += f"""
 PRIORITY BREAKDOWN
 {'-'*30}
 """
         
-        for priority, stats in priority_stats.items():
-            completion_rate = (stats['completed']/stats['total']*100) if stats['total'] > 0 else 0
-            stats_text += f"{priority}: {stats['completed']}/{stats['total']} ({completion_rate:.1f}%)\n"
+        for priority, breakdown in priority_stats.items():
+            completion_rate = (breakdown['completed']/breakdown['total']*100) if breakdown['total'] > 0 else 0
+            stats_text += f"{priority}: {breakdown['completed']}/{breakdown['total']} ({completion_rate:.1f}%)\n"
         
         stats_text += f"""
 OVERDUE TASKS
@@ -731,6 +1206,8 @@ OVERDUE TASKS
                         f.write(f"Description: {task.description if task.description else 'No description'}\n")
                         f.write(f"Priority: {task.priority}\n")
                         f.write(f"Due Date: {task.due_date if task.due_date else 'No due date'}\n")
+                        if task.recurrence:
+                            f.write(f"Repeats: {task.recurrence}\n")
                         f.write(f"Status: {'Completed' if task.completed else 'Pending'}\n")
                         f.write(f"Created: {task.created_at}\n")
                         if task.completed_at:
@@ -742,24 +1219,188 @@ OVERDUE TASKS
         except Exception as e:
             messagebox.showerror("Error", f"Failed to export tasks: {str(e)}")
     
-    def save_tasks(self):
+    def import_csv(self):
+        """Ask for a CSV file and import its tasks"""
+        from tkinter import filedialog
+        filename = filedialog.askopenfilename(
+            title="Import Tasks from CSV",
+            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+        )
+        if filename:
+            try:
+                count = self.import_export.import_from_csv(filename)
+                messagebox.showinfo("Success", f"Imported {count} tasks successfully!")
+            except Exception as e:
+                messagebox.showerror("Error", str(e))
+    
+    def export_csv(self):
+        """Ask for a file name and export all tasks as CSV"""
+        from tkinter import filedialog
+        filename = filedialog.asksaveasfilename(
+            title="Export Tasks to CSV",
+            defaultextension=".csv",
+            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+        )
+        if filename:
+            try:
+                count = self.import_export.export_to_csv(filename)
+                messagebox.showinfo("Success", f"Exported {count} tasks successfully!")
+            except Exception as e:
+                messagebox.showerror("Error", str(e))
+    
+    def show_analytics(self):
+        """Open the analytics window"""
+        self.analytics.show_analytics_window()
+    
+    def show_next_actions(self):
+        """Show pending tasks in dependency order plus the critical path"""
+        window = tk.Toplevel(self.root)
+        window.title("Next Actions")
+        window.geometry("700x550")
+        window.configure(bg='#2c3e50')
+        
+        text_widget = tk.Text(window, wrap=tk.WORD, font=('Arial', 11), 
+                             bg='#ecf0f1', fg='#2c3e50', padx=20, pady=20)
+        text_widget.pack(fill='both', expand=True, padx=20, pady=20)
+        
+        graph = self.store.dependencies
+        with self.store.lock:
+            # Only the head of the order is shown, so only it is computed
+            actions = graph.next_actions(limit=NEXT_ACTIONS_SHOWN)
+            critical_path = graph.critical_path()
+            lines = ["NEXT ACTIONS", "=" * 50]
+            for number, task in enumerate(actions, 1):
+                marker = "⛔" if graph.is_blocked(task) else "▶️"
+                lines.append(f"{number:>3}. {marker} {PRIORITY_ICONS.get(task.priority, '')} {task.title}"
+                             + (f" (due {task.due_date})" if task.due_date else ""))
+            if not actions:
+                lines.append("Nothing left to do! 🎉")
+            
+            lines += ["", f"CRITICAL PATH ({len(critical_path)} tasks)", "-" * 50]
+            lines += [f"{number:>3}. {task.title}" for number, task in enumerate(critical_path, 1)]
+        
+        text_widget.insert(1.0, "\n".join(lines))
+        text_widget.config(state='disabled')
+    
+    def show_calendar(self):
+        """Show open tasks on a scrollable week-by-week calendar"""
+        window = tk.Toplevel(self.root)
+        window.title("Calendar")
+        window.geometry("1000x650")
+        window.configure(bg='#2c3e50')
+        CalendarView(window, self.store, self.show_details_for)
+    
+    def show_diagnostics(self):
+        """Show live latency percentiles and counters"""
+        diagnostics_window = tk.Toplevel(self.root)
+        diagnostics_window.title("Diagnostics")
+        diagnostics_window.geometry("750x500")
+        diagnostics_window.configure(bg='#2c3e50')
+        
+        # Controls
+        controls = ttk.Frame(diagnostics_window, style='Custom.TFrame')
+        controls.pack(fill='x', padx=20, pady=(20, 5))
+        
+        enabled = tk.BooleanVar(value=metrics.enabled)
+        
+        def toggle():
+            metrics.enabled = enabled.get()
+        
+        def export():
+            try:
+                filename = metrics.export()
+                messagebox.showinfo("Success", f"Metrics exported to {filename}")
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to export metrics: {str(e)}")
+        
+        ttk.Checkbutton(controls, text="Collect metrics", variable=enabled, 
+                       command=toggle).pack(side='left', padx=5)
+        ttk.Button(controls, text="Reset", command=metrics.reset, 
+                  style='Action.TButton').pack(side='left', padx=5)
+        ttk.Button(controls, text="📤 Export", command=export, 
+                  style='Action.TButton').pack(side='left', padx=5)
+        
+        # Timings table
+        columns = ('Metric', 'Count', 'p50 (ms)', 'p95 (ms)', 'p99 (ms)', 'Max (ms)')
+        timings_tree = ttk.Treeview(diagnostics_window, style='Custom.Treeview', 
+                                    columns=columns, show='headings', height=12)
+        for column in columns:
+            timings_tree.heading(column, text=column)
+            timings_tree.column(column, width=80, anchor='e')
+        timings_tree.column('Metric', width=250, anchor='w')
+        timings_tree.pack(fill='both', expand=True, padx=20, pady=5)
+        
+        counters_label = ttk.Label(diagnostics_window, text="", style='Heading.TLabel')
+        counters_label.pack(fill='x', padx=20, pady=(5, 20))
+        
+        def update():
+            if not diagnostics_window.winfo_exists():
+                return
+            snapshot = metrics.snapshot()
+            timings_tree.delete(*timings_tree.get_children())
+            for name, timing in snapshot['timings'].items():
+                timings_tree.insert('', 'end', values=(
+                    name, timing['count'], f"{timing['p50_ms']:.2f}", f"{timing['p95_ms']:.2f}",
+                    f"{timing['p99_ms']:.2f}", f"{timing['max_ms']:.2f}"))
+            
+            cache = self.store.query_cache.stats()
+            cache_text = (f"Query cache: {cache['hits']} hits, {cache['misses']} misses, "
+                          f"{cache['refinements']} refinements, {cache['entries']} entries")
+            counters = snapshot['counters']
+            if not metrics.enabled:
+                counters_text = "Metrics collection is off"
+            else:
+                counters_text = ("  ".join(f"{name}: {value}" for name, value in sorted(counters.items()))
+                                 or "No counters recorded yet")
+            counters_label.config(text=f"{cache_text}\n{counters_text}")
+            diagnostics_window.after(1000, update)
+        
+        update()
+    
+    def watch_event_loop(self, expected=None):
+        """Record how late timer callbacks run to detect event-loop stalls"""
+        now = time.perf_counter()
+        if expected is not None and metrics.enabled:
+            lag = max(0.0, (now - expected) * 1000)
+            metrics.observe("ui.event_loop_lag", lag)
+            if lag > STALL_THRESHOLD_MS:
+                metrics.incr("ui.event_loop_stalls")
+        self.root.after(LOOP_TICK_MS, self.watch_event_loop, now + LOOP_TICK_MS / 1000)
+    
+    def save_tasks(self, compact=False):
         """Save tasks to JSON file"""
         try:
-            with open(self.data_file, 'w') as f:
-                json.dump([task.to_dict() for task in self.tasks], f, indent=2)
+            self.store.save(compact=compact)
         except Exception as e:
             print(f"Error saving tasks: {e}")
     
     def load_tasks(self):
         """Load tasks from JSON file"""
         try:
-            if os.path.exists(self.data_file):
-                with open(self.data_file, 'r') as f:
-                    data = json.load(f)
-                    self.tasks = [Task.from_dict(task_data) for task_data in data]
+            self.store.load()
         except Exception as e:
             print(f"Error loading tasks: {e}")
-            self.tasks = []
+    
+    def archive_old_tasks(self):
+        """Move long-completed tasks out of the working set"""
+        try:
+            count = self.store.archive_completed()
+        except Exception as e:
+            print(f"Error archiving tasks: {e}")
+            return
+        if count:
+            self.refresh_task_list()
+            self.update_statistics()
+    
+    def watch_store(self):
+        """Refresh the list when the store was changed outside the window"""
+        try:
+            self.store.sync()
+        except Exception as e:
+            print(f"Error syncing tasks: {e}")
+        if self.store.generation != self._rendered_generation:
+            self.refresh_task_list()
+        self.root.after(1000, self.watch_store)
     
     def auto_save_loop(self):
         """Auto-save tasks every 30 seconds"""
@@ -769,7 +1410,8 @@ OVERDUE TASKS
     
     def on_closing(self):
         """Handle application closing"""
-        self.save_tasks()
+        # Fold the journal into tasks.json so the file is complete on its own
+        self.save_tasks(compact=True)
         self.root.destroy()
 
 class TaskNotificationSystem:
@@ -784,33 +1426,41 @@ class TaskNotificationSystem:
         """Check for task notifications"""
         while True:
             try:
-                current_time = datetime.now()
-                
-                for task in self.task_manager.tasks:
-                    if task.completed or not task.due_date:
-                        continue
-                    
-                    try:
-                        due_date = datetime.strptime(task.due_date, '%Y-%m-%d')
-                        days_until_due = (due_date.date() - current_time.date()).days
-                        
-                        # Notify for tasks due today or overdue
-                        if days_until_due <= 0:
-                            self.show_notification(task, "overdue" if days_until_due < 0 else "due_today")
-                        elif days_until_due == 1:
-                            self.show_notification(task, "due_tomorrow")
-                        elif days_until_due <= 3:
-                            self.show_notification(task, "due_soon")
-                    
-                    except ValueError:
-                        continue
-                
+                self.scan_due_tasks()
                 time.sleep(3600)  # Check every hour
             
             except Exception as e:
                 print(f"Notification error: {e}")
                 time.sleep(3600)
     
+    @metrics.timed("notifications.scan")
+    def scan_due_tasks(self):
+        """Notify about tasks that are overdue or due within three days
+        
+        A recurring task's due date is always its next open occurrence, so
+        it is reported once, for that occurrence.
+        """
+        current_time = datetime.now()
+        
+        for task in self.task_manager.tasks:
+            if task.completed or not task.due_date:
+                continue
+            
+            try:
+                due_date = datetime.strptime(task.due_date, '%Y-%m-%d')
+                days_until_due = (due_date.date() - current_time.date()).days
+                
+                # Notify for tasks due today or overdue
+                if days_until_due <= 0:
+                    self.show_notification(task, "overdue" if days_until_due < 0 else "due_today")
+                elif days_until_due == 1:
+                    self.show_notification(task, "due_tomorrow")
+                elif days_until_due <= 3:
+                    self.show_notification(task, "due_soon")
+            
+            except ValueError:
+                continue
+    
     def show_notification(self, task, notification_type):
         """Show notification for a task"""
         messages = {
@@ -821,6 +1471,8 @@ class TaskNotificationSystem:
         }
         
         message = messages.get(notification_type, f"Reminder: {task.title}")
+        if task.recurrence:
+            message += f" 🔁 {task.recurrence}"
         
         # Create notification window
         notification = tk.Toplevel(self.task_manager.root)
@@ -857,60 +1509,23 @@ class TaskImportExport:
     def __init__(self, task_manager):
         self.task_manager = task_manager
     
+    @metrics.timed("import_export.import_from_csv")
     def import_from_csv(self, filename):
         """Import tasks from CSV file"""
         try:
-            import csv
-            with open(filename, 'r', newline='', encoding='utf-8') as csvfile:
-                reader = csv.DictReader(csvfile)
-                imported_count = 0
-                
-                for row in reader:
-                    try:
-                        task = Task(
-                            title=row.get('Title', ''),
-                            description=row.get('Description', ''),
-                            category=row.get('Category', 'General'),
-                            priority=row.get('Priority', 'Medium'),
-                            due_date=row.get('Due Date', ''),
-                            completed=row.get('Completed', '').lower() == 'true'
-                        )
-                        self.task_manager.tasks.append(task)
-                        imported_count += 1
-                    except Exception as e:
-                        print(f"Error importing row: {e}")
-                
-                self.task_manager.refresh_task_list()
-                self.task_manager.save_tasks()
-                return imported_count
-                
+            imported_count = self.task_manager.store.import_csv(filename)
         except Exception as e:
             raise Exception(f"Failed to import CSV: {str(e)}")
+        
+        self.task_manager.refresh_task_list()
+        self.task_manager.save_tasks()
+        return imported_count
     
+    @metrics.timed("import_export.export_to_csv")
     def export_to_csv(self, filename):
         """Export tasks to CSV file"""
         try:
-            import csv
-            with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-                fieldnames = ['Title', 'Description', 'Category', 'Priority', 'Due Date', 
-                             'Completed', 'Created At', 'Completed At']
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                
-                writer.writeheader()
-                for task in self.task_manager.tasks:
-                    writer.writerow({
-                        'Title': task.title,
-                        'Description': task.description,
-                        'Category': task.category,
-                        'Priority': task.priority,
-                        'Due Date': task.due_date,
-                        'Completed': task.completed,
-                        'Created At': task.created_at,
-                        'Completed At': task.completed_at or ''
-                    })
-            
-            return len(self.task_manager.tasks)
-            
+            return self.task_manager.store.export_csv(filename)
         except Exception as e:
             raise Exception(f"Failed to export CSV: {str(e)}")
 
@@ -919,57 +1534,18 @@ class TaskAnalytics:
     
     def __init__(self, task_manager):
         self.task_manager = task_manager
+        # Imported here so the process pool machinery stays out of startup
+        from taskanalytics import AnalyticsEngine
+        self.engine = AnalyticsEngine(task_manager.store)
     
+    @metrics.timed("analytics.get_productivity_metrics")
     def get_productivity_metrics(self):
-        """Calculate productivity metrics"""
-        if not self.task_manager.tasks:
-            return {}
-        
-        completed_tasks = [task for task in self.task_manager.tasks if task.completed]
-        total_tasks = len(self.task_manager.tasks)
-        
-        # Calculate completion rate
-        completion_rate = (len(completed_tasks) / total_tasks) * 100 if total_tasks > 0 else 0
-        
-        # Calculate average completion time
-        completion_times = []
-        for task in completed_tasks:
-            if task.completed_at and task.created_at:
-                try:
-                    created = datetime.strptime(task.created_at, '%Y-%m-%d %H:%M:%S')
-                    completed = datetime.strptime(task.completed_at, '%Y-%m-%d %H:%M:%S')
-                    completion_times.append((completed - created).days)
-                except ValueError:
-                    continue
-        
-        avg_completion_time = sum(completion_times) / len(completion_times) if completion_times else 0
-        
-        # Tasks by priority
-        priority_breakdown = {}
-        for task in self.task_manager.tasks:
-            if task.priority not in priority_breakdown:
-                priority_breakdown[task.priority] = {'total': 0, 'completed': 0}
-            priority_breakdown[task.priority]['total'] += 1
-            if task.completed:
-                priority_breakdown[task.priority]['completed'] += 1
-        
-        # Tasks by category
-        category_breakdown = {}
-        for task in self.task_manager.tasks:
-            if task.category not in category_breakdown:
-                category_breakdown[task.category] = {'total': 0, 'completed': 0}
-            category_breakdown[task.category]['total'] += 1
-            if task.completed:
-                category_breakdown[task.category]['completed'] += 1
-        
-        return {
-            'total_tasks': total_tasks,
-            'completed_tasks': len(completed_tasks),
-            'completion_rate': completion_rate,
-            'avg_completion_time': avg_completion_time,
-            'priority_breakdown': priority_breakdown,
-            'category_breakdown': category_breakdown
-        }
+        """Calculate productivity metrics, including archived history
+        
+        Archive segments are aggregated in worker processes and cached
+        until they change; only the working set is counted every time.
+        """
+        return self.engine.compute()
     
     def show_analytics_window(self):
         """Show analytics window"""
@@ -995,13 +1571,41 @@ class TaskAnalytics:
         trends_frame = ttk.Frame(notebook)
         notebook.add(trends_frame, text='Trends')
         
-        # Get metrics
-        metrics = self.get_productivity_metrics()
-        
         # Overview tab content
         overview_text = tk.Text(overview_frame, wrap=tk.WORD, font=('Arial', 12))
         overview_text.pack(fill='both', expand=True, padx=10, pady=10)
+        overview_text.insert(1.0, "Computing analytics…")
+        overview_text.config(state='disabled')
+        
+        # Metrics are computed on a background thread so the window stays
+        # responsive; Tk is only touched from this thread, by polling
+        result = {}
+        
+        def compute():
+            try:
+                result['metrics'] = self.get_productivity_metrics()
+            except Exception as e:
+                result['error'] = e
         
+        def poll():
+            if not overview_text.winfo_exists():
+                return
+            if not result:
+                analytics_window.after(100, poll)
+                return
+            overview_text.config(state='normal')
+            overview_text.delete(1.0, tk.END)
+            if 'error' in result:
+                overview_text.insert(1.0, f"Error computing analytics: {result['error']}")
+            else:
+                overview_text.insert(1.0, self.format_overview(result['metrics']))
+            overview_text.config(state='disabled')
+        
+        threading.Thread(target=compute, daemon=True).start()
+        poll()
+    
+    def format_overview(self, metrics) -> str:
+        """Text of the Overview tab"""
         overview_content = f"""TASK ANALYTICS OVERVIEW
 {'='*50}
 
@@ -1028,63 +1632,49 @@ CATEGORY BREAKDOWN
             rate = (stats['completed']/stats['total']*100) if stats['total'] > 0 else 0
             overview_content += f"{category}: {stats['completed']}/{stats['total']} ({rate:.1f}%)\n"
         
-        overview_text.insert(1.0, overview_content)
-        overview_text.config(state='disabled')
+        return overview_content
 
-def main():
+def main(argv=None):
     """Main function to run the application"""
-    root = tk.Tk()
-    app = AdvancedTaskManager(root)
+    parser = argparse.ArgumentParser(description="Advanced Task Manager")
+    parser.add_argument('--api-port', type=int, default=0,
+                        help="also serve the local HTTP API on this port")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="print startup phase timings and the slowest calls")
+    parser.add_argument('--archive-after-days', type=int, default=ARCHIVE_AFTER_DAYS,
+                        help="archive tasks completed this many days ago (0 disables, "
+                             f"default: {ARCHIVE_AFTER_DAYS})")
+    args = parser.parse_args(argv)
     
-    # Initialize additional features
-    notification_system = TaskNotificationSystem(app)
-    import_export = TaskImportExport(app)
-    analytics = TaskAnalytics(app)
+    startup = StartupProfile()
+    startup.mark("imports")
+    profiler = None
+    if args.profile_startup:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
     
-    # Add import/export buttons to the main interface
-    def add_import_export_buttons():
-        # Create additional buttons frame
-        extra_buttons_frame = ttk.Frame(app.root, style='Custom.TFrame')
-        extra_buttons_frame.pack(fill='x', padx=20, pady=5)
-        
-        def import_csv():
-            from tkinter import filedialog
-            filename = filedialog.askopenfilename(
-                title="Import Tasks from CSV",
-                filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
-            )
-            if filename:
-                try:
-                    count = import_export.import_from_csv(filename)
-                    messagebox.showinfo("Success", f"Imported {count} tasks successfully!")
-                except Exception as e:
-                    messagebox.showerror("Error", str(e))
-        
-        def export_csv():
-            from tkinter import filedialog
-            filename = filedialog.asksaveasfilename(
-                title="Export Tasks to CSV",
-                defaultextension=".csv",
-                filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
-            )
-            if filename:
-                try:
-                    count = import_export.export_to_csv(filename)
-                    messagebox.showinfo("Success", f"Exported {count} tasks successfully!")
-                except Exception as e:
-                    messagebox.showerror("Error", str(e))
-        
-        ttk.Button(extra_buttons_frame, text="📥 Import CSV", 
-                  command=import_csv, style='Action.TButton').pack(side='left', padx=5)
-        
-        ttk.Button(extra_buttons_frame, text="📤 Export CSV", 
-                  command=export_csv, style='Action.TButton').pack(side='left', padx=5)
-        
-        ttk.Button(extra_buttons_frame, text="📊 Analytics", 
-                  command=analytics.show_analytics_window, style='Action.TButton').pack(side='left', padx=5)
+    root = tk.Tk()
+    startup.mark("create root window")
+    app = AdvancedTaskManager(root, startup)
+    app.store.archive_after_days = args.archive_after_days
+    
+    # Share the window's store with other tools over HTTP
+    if args.api_port:
+        from taskserver import TaskAPIServer
+        app.api_server = TaskAPIServer(app.store, port=args.api_port)
+        app.api_server.start_in_thread()
     
-    # Add the buttons after a short delay to ensure the main interface is ready
-    root.after(100, add_import_export_buttons)
+    if args.profile_startup:
+        # Draw the first frame now so it can be timed
+        root.update()
+        startup.mark("first frame")
+        profiler.disable()
+        print(startup.report())
+        
+        import pstats
+        print()
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(20)
     
     # Start the application
     root.mainloop()
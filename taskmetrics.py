@@ -0,0 +1,134 @@
+"""Lightweight timers, counters and latency histograms.
+
+Instrumentation is off unless ``TASKMANAGER_METRICS=1`` is set or
+``metrics.enabled`` is switched on (the diagnostics window has a toggle).
+While disabled a timed function costs one attribute check per call.
+"""
+
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+import functools
+import json
+import math
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+
+def percentile(ordered, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence"""
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class Histogram:
+    """Latency distribution over the most recent samples"""
+
+    def __init__(self, window: int = 2048):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.samples.append(value)
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def summary(self) -> Dict:
+        ordered = sorted(self.samples)
+        return {
+            'count': self.count,
+            'mean_ms': self.total / self.count if self.count else 0.0,
+            'p50_ms': percentile(ordered, 50),
+            'p95_ms': percentile(ordered, 95),
+            'p99_ms': percentile(ordered, 99),
+            'max_ms': self.max
+        }
+
+
+class MetricsRegistry:
+    """Named counters and millisecond histograms"""
+
+    def __init__(self, enabled: bool = False, window: int = 2048):
+        self.enabled = enabled
+        self.window = window
+        self.counters: Dict[str, int] = {}
+        self.histograms: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def incr(self, name: str, amount: int = 1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe(self, name: str, ms: float):
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram(self.window)
+            histogram.observe(ms)
+
+    @contextmanager
+    def timer(self, name: str):
+        """Time the enclosed block into the named histogram"""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, (time.perf_counter() - start) * 1000)
+
+    def timed(self, name: str):
+        """Decorator timing every call of a function"""
+        def decorate(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.observe(name, (time.perf_counter() - start) * 1000)
+            return wrapper
+        return decorate
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'counters': dict(self.counters),
+                'timings': {name: histogram.summary()
+                            for name, histogram in sorted(self.histograms.items())}
+            }
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def export(self, filename: Optional[str] = None) -> str:
+        """Write a JSON snapshot for offline analysis and return its file name"""
+        if filename is None:
+            filename = f"metrics_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        data = self.snapshot()
+        data['exported_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        with open(filename, 'w') as f:
+            json.dump(data, f, indent=2)
+        return filename
+
+
+# Process-wide registry used by the store, the GUI and the CLI
+metrics = MetricsRegistry(enabled=os.environ.get('TASKMANAGER_METRICS') == '1')
@@ -0,0 +1,443 @@
+"""Local HTTP/JSON API over the task store.
+
+Run standalone with ``python taskserver.py`` or start it inside the GUI with
+``python taskmanager.py --api-port 8765`` so the window and other tools share
+one store. Endpoints:
+
+    GET    /tasks?search=&category=&priority=&status=&limit=&cursor=
+    GET    /tasks?search=<query>&explain=1   (query plan instead of tasks)
+    POST   /tasks
+    GET    /tasks/<id>
+    PATCH  /tasks/<id>
+    DELETE /tasks/<id>
+    POST   /tasks/bulk
+    GET    /stats
+    GET    /metrics
+"""
+
+import argparse
+import asyncio
+import base64
+import heapq
+import json
+import sys
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from taskmetrics import MetricsRegistry, metrics
+from taskstore import (Task, TaskStore, CATEGORIES, PRIORITIES, STATUSES, task_sort_key,
+                       validate_due_date, validate_recurrence)
+
+DEFAULT_PORT = 8765
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+MAX_BODY_SIZE = 16 * 1024 * 1024
+KEEP_ALIVE_TIMEOUT = 15
+SYNC_INTERVAL = 1.0
+
+STATUS_TEXT = {200: "OK", 201: "Created", 204: "No Content", 400: "Bad Request",
+               404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large",
+               500: "Internal Server Error"}
+
+
+class APIError(Exception):
+    """Error returned to the client as a JSON body"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def require_object(value, what: str) -> Dict:
+    """Reject JSON values that are not objects"""
+    if not isinstance(value, dict):
+        raise APIError(400, f"{what} must be a JSON object")
+    return value
+
+
+def page_key(task: Task) -> Tuple:
+    """Total ordering used for cursor pagination"""
+    return task_sort_key(task) + (task.id,)
+
+
+def encode_cursor(key: Tuple) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple:
+    try:
+        completed, priority, due_date, task_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return (bool(completed), int(priority), str(due_date), int(task_id))
+    except Exception:
+        raise APIError(400, "Invalid cursor")
+
+
+class TaskAPIServer:
+    """Asyncio HTTP/1.1 server exposing CRUD, queries and statistics"""
+
+    def __init__(self, store: TaskStore, host: str = "127.0.0.1", port: int = DEFAULT_PORT,
+                 save_delay: float = 0.5):
+        self.store = store
+        self.host = host
+        self.port = port
+        self.save_delay = save_delay
+        # Request latencies are always recorded, independent of the global switch
+        self.latency = MetricsRegistry(enabled=True, window=1000)
+        self._server = None
+        self._save_handle = None
+        self._loop = None
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._loop.call_later(SYNC_INTERVAL, self.sync)
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            async with self._server:
+                await self._server.serve_forever()
+        finally:
+            self.flush()
+
+    def start_in_thread(self) -> threading.Thread:
+        """Run the server on a daemon thread next to another event loop (e.g. Tk)"""
+        started = threading.Event()
+
+        def run():
+            async def runner():
+                await self.start()
+                started.set()
+                async with self._server:
+                    await self._server.serve_forever()
+            asyncio.run(runner())
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        started.wait(5)
+        return thread
+
+    def schedule_save(self):
+        """Coalesce bursts of writes into one persistence commit"""
+        if self._save_handle is None:
+            self._save_handle = self._loop.call_later(self.save_delay, self.flush)
+
+    def flush(self):
+        self._save_handle = None
+        try:
+            self.store.save()
+        except Exception as e:
+            print(f"Error saving tasks: {e}")
+
+    def sync(self):
+        """Merge changes other processes saved to the same data file"""
+        try:
+            self.store.sync()
+        except Exception as e:
+            print(f"Error syncing tasks: {e}")
+        self._loop.call_later(SYNC_INTERVAL, self.sync)
+
+    # ------------------------------------------------------------------
+    # HTTP handling
+    # ------------------------------------------------------------------
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), KEEP_ALIVE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    break
+                if not request_line:
+                    break
+                start = time.perf_counter()
+
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self.send(writer, 400, {'error': "Malformed request line"}, False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection != 'close' and (version == 'HTTP/1.1' or connection == 'keep-alive')
+
+                try:
+                    length = int(headers.get('content-length', 0) or 0)
+                    if length < 0:
+                        raise ValueError
+                except ValueError:
+                    await self.send(writer, 400, {'error': "Invalid Content-Length"}, False)
+                    break
+                if length > MAX_BODY_SIZE:
+                    await self.send(writer, 413, {'error': "Request body too large"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                route, status, payload = self.dispatch(method, target, body)
+                await self.send(writer, status, payload, keep_alive)
+                self.latency.observe(route, (time.perf_counter() - start) * 1000)
+
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def send(self, writer: asyncio.StreamWriter, status: int, payload, keep_alive: bool):
+        body = b'' if payload is None else json.dumps(payload).encode('utf-8')
+        head = (f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+    def dispatch(self, method: str, target: str, body: bytes):
+        """Route a request, returning (route name, status, JSON payload)"""
+        url = urlsplit(target)
+        parts = [part for part in url.path.split('/') if part]
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        route = f"{method} /{parts[0] if parts else ''}"
+
+        try:
+            data = json.loads(body) if body else {}
+        except ValueError:
+            return route, 400, {'error': "Body is not valid JSON"}
+
+        try:
+            if parts == ['tasks']:
+                if method == 'GET':
+                    return route, 200, self.list_tasks(params)
+                if method == 'POST':
+                    return route, 201, self.create_task(require_object(data, "Request body"))
+            elif parts == ['tasks', 'bulk']:
+                route = f"{method} /tasks/bulk"
+                if method == 'POST':
+                    return route, 200, self.bulk(require_object(data, "Request body"))
+            elif len(parts) == 2 and parts[0] == 'tasks':
+                route = f"{method} /tasks/<id>"
+                task = self.store.get(parts[1], include_archive=True)
+                if task is None:
+                    raise APIError(404, f"No task with ID {parts[1]}")
+                if method == 'GET':
+                    return route, 200, task.to_dict()
+                if method == 'PATCH':
+                    return route, 200, self.update_task(task, require_object(data, "Request body"))
+                if method == 'DELETE':
+                    self.store.remove(task)
+                    self.schedule_save()
+                    return route, 204, None
+            elif parts == ['stats'] and method == 'GET':
+                stats = self.store.statistics()
+                stats['overdue_tasks'] = [task.id for task in stats['overdue_tasks']]
+                return route, 200, stats
+            elif parts == ['metrics'] and method == 'GET':
+                return route, 200, {'generation': self.store.generation,
+                                    'tasks': len(self.store),
+                                    'latency': self.latency.snapshot()['timings'],
+                                    'query_cache': self.store.query_cache.stats(),
+                                    'internals': metrics.snapshot()}
+            else:
+                raise APIError(404, "Unknown endpoint")
+            raise APIError(405, f"{method} is not supported here")
+        except APIError as e:
+            return route, e.status, {'error': str(e)}
+        except Exception as e:
+            return route, 500, {'error': str(e)}
+
+    # ------------------------------------------------------------------
+    # Endpoints
+    # ------------------------------------------------------------------
+
+    def list_tasks(self, params: Dict) -> Dict:
+        status = params.get('status', 'All')
+        if status not in STATUSES:
+            raise APIError(400, f"Unknown status: {status}")
+        category = params.get('category', 'All')
+        if category != "All" and category not in CATEGORIES:
+            raise APIError(400, f"Unknown category: {category}")
+        priority = params.get('priority', 'All')
+        if priority != "All" and priority not in PRIORITIES:
+            raise APIError(400, f"Unknown priority: {priority}")
+        try:
+            limit = min(MAX_PAGE_SIZE, max(1, int(params.get('limit', DEFAULT_PAGE_SIZE))))
+        except ValueError:
+            raise APIError(400, "limit must be an integer")
+
+        query = {'search': params.get('search', ''),
+                 'category': category,
+                 'priority': priority,
+                 'status': status}
+        try:
+            if params.get('explain'):
+                return {'plan': self.store.explain(**query)}
+            tasks = self.store.query(**query)
+        except ValueError as e:
+            raise APIError(400, str(e))
+        total = len(tasks)
+        if 'cursor' in params:
+            after = decode_cursor(params['cursor'])
+            tasks = [task for task in tasks if page_key(task) > after]
+
+        # Only the requested page is sorted, not the whole result
+        page = heapq.nsmallest(limit + 1, tasks, key=page_key)
+        next_cursor = encode_cursor(page_key(page[limit - 1])) if len(page) > limit else None
+        return {'tasks': [task.to_dict() for task in page[:limit]],
+                'total': total,
+                'next_cursor': next_cursor}
+
+    def task_from_data(self, data: Dict) -> Task:
+        title = str(data.get('title', '')).strip()
+        if not title:
+            raise APIError(400, "Task title is required!")
+        fields = self.validate_fields(data)
+        task = Task(title,
+                    fields.get('description', ''),
+                    fields.get('category', 'General'),
+                    fields.get('priority', 'Medium'),
+                    fields.get('due_date', ''),
+                    recurrence=fields.get('recurrence', ''))
+        if 'blocked_by' in fields:
+            self.check_blockers(task, fields['blocked_by'])
+            task.blocked_by = fields['blocked_by']
+        if data.get('completed'):
+            task.mark_complete()
+        return task
+
+    def check_blockers(self, task: Task, blocker_ids, planned: Optional[Dict] = None):
+        try:
+            self.store.dependencies.check(task, blocker_ids, planned)
+        except ValueError as e:
+            raise APIError(400, str(e))
+
+    def validate_fields(self, data: Dict) -> Dict:
+        fields = {name: data[name] for name in TaskStore.EDITABLE_FIELDS if name in data}
+        for name in ('description', 'due_date', 'recurrence'):
+            if name in fields and fields[name] is None:
+                fields[name] = ""
+        for name in ('title', 'description', 'category', 'priority', 'due_date', 'recurrence'):
+            if name in fields and not isinstance(fields[name], str):
+                raise APIError(400, f"{name} must be a string")
+        if 'title' in fields and not fields['title'].strip():
+            raise APIError(400, "Task title is required!")
+        if 'category' in fields and fields['category'] not in CATEGORIES:
+            raise APIError(400, f"Unknown category: {fields['category']}")
+        if 'priority' in fields and fields['priority'] not in PRIORITIES:
+            raise APIError(400, f"Unknown priority: {fields['priority']}")
+        if not validate_due_date(fields.get('due_date', '')):
+            raise APIError(400, "Invalid date format! Use YYYY-MM-DD")
+        recurrence = fields.get('recurrence', '')
+        if not validate_recurrence(recurrence):
+            raise APIError(400, f"Unknown repeat rule: {recurrence}")
+        if 'blocked_by' in fields:
+            blockers = fields['blocked_by']
+            # bool is an int subclass, but true is not a task ID
+            if not isinstance(blockers, list) or not all(
+                    isinstance(blocker, int) and not isinstance(blocker, bool) for blocker in blockers):
+                raise APIError(400, "blocked_by must be a list of task IDs")
+        return fields
+
+    def create_task(self, data: Dict) -> Dict:
+        task = self.store.add(self.task_from_data(data))
+        self.schedule_save()
+        return task.to_dict()
+
+    def update_task(self, task: Task, data: Dict) -> Dict:
+        fields = self.validate_fields(data)
+        with self.store.grouped(f"Edit '{task.title}'"):
+            if 'blocked_by' in fields:
+                self.check_blockers(task, fields['blocked_by'])
+            if fields:
+                self.store.update(task, **fields)
+            if 'completed' in data and bool(data['completed']) != task.completed:
+                self.store.set_completed(task, bool(data['completed']))
+        self.schedule_save()
+        return task.to_dict()
+
+    def bulk(self, data: Dict) -> Dict:
+        """Apply a list of operations; all are validated before any is applied"""
+        operations = data.get('operations')
+        if not isinstance(operations, list):
+            raise APIError(400, "Expected an 'operations' list")
+
+        plan = []
+        planned_blockers = {}  # Edges set by earlier operations, for cycle checks
+        for index, operation in enumerate(operations):
+            try:
+                op = require_object(operation, "Operation").get('op')
+                if op == 'add':
+                    plan.append((op, self.task_from_data(require_object(operation.get('task', {}), "task")),
+                                 None))
+                    continue
+                task = self.store.get(operation.get('id'), include_archive=True)
+                if task is None:
+                    raise APIError(404, f"No task with ID {operation.get('id')}")
+                if op == 'update':
+                    fields = self.validate_fields(require_object(operation.get('fields', {}), "fields"))
+                    if 'blocked_by' in fields:
+                        self.check_blockers(task, fields['blocked_by'], planned_blockers)
+                        planned_blockers[task.id] = fields['blocked_by']
+                    plan.append((op, task, fields))
+                elif op in ('complete', 'reopen', 'delete'):
+                    plan.append((op, task, None))
+                else:
+                    raise APIError(400, f"Unknown operation: {op}")
+            except APIError as e:
+                raise APIError(e.status, f"Operation {index}: {e}")
+
+        added = [task for op, task, _ in plan if op == 'add']
+        # One undo step; consecutive edits of the same kind are applied together
+        with self.store.grouped(f"Apply {len(plan)} operations"):
+            run = []
+            for position, (op, task, fields) in enumerate(plan):
+                if op in ('update', 'complete', 'reopen'):
+                    run.append(task)
+                following = plan[position + 1] if position + 1 < len(plan) else None
+                if run and (following is None or following[0] != op or following[2] != fields):
+                    if op == 'update':
+                        self.store.update_many(run, **fields)
+                    else:
+                        self.store.set_completed_many(run, op == 'complete')
+                    run = []
+            self.store.add_many(added)
+            self.store.remove_many([task for op, task, _ in plan if op == 'delete'])
+        self.schedule_save()
+        return {'applied': len(plan), 'created': [task.id for task in added]}
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Local HTTP/JSON API for the task manager")
+    parser.add_argument('--data-file', default="tasks.json")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    args = parser.parse_args(argv)
+
+    store = TaskStore(args.data_file)
+    store.load()
+    server = TaskAPIServer(store, args.host, args.port)
+    print(f"Serving {args.data_file} on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        server.store.save(compact=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,2516 @@
+"""Headless task storage shared by the GUI, the CLI and other front ends.
+
+Nothing in this module imports tkinter, so it can be used on machines
+without a display and starts quickly for scripted batch operations.
+"""
+
+import bisect
+import calendar
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from datetime import datetime, date, timedelta
+import functools
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import heapq
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from taskmetrics import metrics
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+CATEGORIES = ["General", "Work", "Personal", "Health", "Education", "Finance"]
+PRIORITIES = ["Low", "Medium", "High", "Critical"]
+# Ready and Blocked split pending tasks by whether they still wait for another task
+STATUSES = ["All", "Completed", "Pending", "Ready", "Blocked"]
+
+PRIORITY_ORDER = {"Critical": 0, "High": 1, "Medium": 2, "Low": 3}
+PRIORITY_ICONS = {"Critical": "🔴", "High": "🟠", "Medium": "🟡", "Low": "🟢"}
+
+# Repeat choices offered in the GUI; "every N days/weeks/months" is also accepted
+RECURRENCE_PRESETS = ["Never", "Daily", "Weekly", "Monthly"]
+
+# Statistics count occurrences due within this many days (today included)
+UPCOMING_DAYS = 7
+
+# Undo history limits; the oldest entries are dropped first
+UNDO_LIMIT = 100
+UNDO_MEMORY_BUDGET = 64 * 1024 * 1024  # Estimated bytes
+
+# Completed tasks older than this move to the archive (0 disables archiving)
+ARCHIVE_AFTER_DAYS = 90
+
+# Longer descriptions are kept out of the snapshot (see DescriptionStore)
+INLINE_DESCRIPTION_LIMIT = 80
+
+DATE_FORMAT = '%Y-%m-%d'
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+CSV_FIELDS = ['Title', 'Description', 'Category', 'Priority', 'Due Date',
+              'Completed', 'Created At', 'Completed At', 'Repeat']
+
+_id_lock = threading.Lock()
+_last_id = 0
+
+
+def new_task_id() -> int:
+    """Return a unique, increasing ID based on the current timestamp"""
+    global _last_id
+    with _id_lock:
+        # Tasks created within the same microsecond (bulk imports, batch
+        # mode) would otherwise share an ID
+        _last_id = max(int(time.time() * 1000000), _last_id + 1)
+        return _last_id
+
+
+def validate_due_date(due_date: str) -> bool:
+    """Check that a due date is empty or in YYYY-MM-DD format"""
+    if not due_date:
+        return True
+    try:
+        datetime.strptime(due_date, DATE_FORMAT)
+        return True
+    except ValueError:
+        return False
+
+
+def validate_recurrence(text: str) -> bool:
+    """Check that a repeat rule is empty, "Never" or one Recurrence.parse accepts"""
+    try:
+        Recurrence.parse(text)
+        return True
+    except ValueError:
+        return False
+
+
+def is_overdue(task, today: Optional[date] = None) -> bool:
+    """Check whether a pending task is past its due date"""
+    if not task.due_date or task.completed:
+        return False
+    try:
+        due_date = datetime.strptime(task.due_date, DATE_FORMAT).date()
+    except ValueError:
+        return False
+    return due_date < (today or date.today())
+
+
+class FileLock:
+    """Exclusive lock shared between processes, held on a sidecar file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+        self._depth = 0
+
+    def __enter__(self):
+        if self._depth == 0:
+            self._file = open(self.path, 'a+b')
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+            else:
+                self._file.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        # LK_LOCK gives up after ~10 seconds; keep waiting
+                        continue
+        self._depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._depth -= 1
+        if self._depth == 0:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+            self._file.close()
+            self._file = None
+
+
+def task_sort_key(task):
+    """Sort key used by every task list: pending first, then priority and due date"""
+    return (
+        task.completed,  # Completed tasks go last
+        PRIORITY_ORDER.get(task.priority, 4),  # Sort by priority
+        task.due_date if task.due_date else "9999-12-31"  # Sort by due date
+    )
+
+
+class Recurrence:
+    """A repeat rule: every ``interval`` days, weeks or months
+
+    Occurrences are numbered from a start date and computed on demand, so
+    a rule costs the same however far ahead a view looks. Monthly rules
+    keep the start date's day, clamped to shorter months.
+    """
+
+    UNITS = ('day', 'week', 'month')
+    NAMES = {'daily': 'day', 'weekly': 'week', 'monthly': 'month'}
+
+    def __init__(self, interval: int, unit: str):
+        self.interval = interval
+        self.unit = unit
+
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def parse(text: str) -> Optional["Recurrence"]:
+        """Parse "daily", "weekly", "monthly" or "every N days/weeks/months"
+
+        Returns None for one-off tasks ("" or "Never").
+        """
+        words = text.strip().lower().split()
+        if not words or words == ['never']:
+            return None
+        if len(words) == 1 and words[0] in Recurrence.NAMES:
+            return Recurrence(1, Recurrence.NAMES[words[0]])
+        if words[0] == 'every' and len(words) in (2, 3):
+            unit = words[-1][:-1] if words[-1].endswith('s') else words[-1]
+            try:
+                interval = int(words[1]) if len(words) == 3 else 1
+            except ValueError:
+                interval = 0
+            if unit in Recurrence.UNITS and interval > 0:
+                return Recurrence(interval, unit)
+        raise ValueError(f"Unknown repeat rule: {text}")
+
+    def __str__(self):
+        if self.interval == 1:
+            return {unit: name for name, unit in self.NAMES.items()}[self.unit]
+        return f"every {self.interval} {self.unit}s"
+
+    def nth(self, start: date, n: int) -> date:
+        """Date of occurrence n (0 is the start date)"""
+        if self.unit == 'month':
+            month = start.month - 1 + n * self.interval
+            year = start.year + month // 12
+            month = month % 12 + 1
+            return date(year, month, min(start.day, calendar.monthrange(year, month)[1]))
+        step = self.interval * (7 if self.unit == 'week' else 1)
+        return start + timedelta(days=n * step)
+
+    def index_on_or_after(self, start: date, day: date) -> int:
+        """Number of the first occurrence falling on or after day"""
+        if day <= start:
+            return 0
+        if self.unit == 'month':
+            months = (day.year - start.year) * 12 + day.month - start.month
+            n = months // self.interval
+            while self.nth(start, n) < day:
+                n += 1
+            return n
+        step = self.interval * (7 if self.unit == 'week' else 1)
+        return -(-(day - start).days // step)
+
+    def between(self, start: date, first: date, last: date) -> Iterator[date]:
+        """Occurrences from first to last inclusive"""
+        n = self.index_on_or_after(start, first)
+        day = self.nth(start, n)
+        while day <= last:
+            yield day
+            n += 1
+            day = self.nth(start, n)
+
+    def next_after(self, start: date, day: date) -> date:
+        return self.nth(start, self.index_on_or_after(start, day + timedelta(days=1)))
+
+
+class Task:
+    def __init__(self, title: str, description: str = "", category: str = "General",
+                 priority: str = "Medium", due_date: str = "", completed: bool = False,
+                 recurrence: str = ""):
+        self.id = new_task_id()  # Unique ID based on timestamp
+        self.title = title
+        self._descriptions = None  # DescriptionStore holding the text when stored out of line
+        self.description = description
+        self.category = category
+        self.priority = priority
+        self.due_date = due_date
+        self.completed = completed
+        self.created_at = datetime.now().strftime(TIMESTAMP_FORMAT)
+        self.completed_at = None
+        self.recurrence = recurrence  # Repeat rule text, "" for one-off tasks
+        self.anchor_recurrence()
+        self.blocked_by: List[int] = []  # IDs of tasks that must be completed first
+
+    @property
+    def description(self) -> str:
+        if self._description is None:
+            # Stored out of line; read on demand instead of kept in memory
+            return self._descriptions.get(self.description_ref)
+        return self._description
+
+    @description.setter
+    def description(self, value: str):
+        self._description = value
+        self.description_ref = None
+
+    def detach_description(self, descriptions: "DescriptionStore", key: str):
+        """Drop the in-memory description in favour of a stored copy"""
+        self._descriptions = descriptions
+        self.description_ref = key
+        self._description = None
+
+    def load_description(self):
+        """Keep an out-of-line description in memory (it stays referenced)"""
+        if self._description is None:
+            self._description = self._descriptions.get(self.description_ref)
+
+    @property
+    def rule(self) -> Optional[Recurrence]:
+        """Parsed repeat rule, or None for one-off tasks and unreadable rules"""
+        try:
+            return Recurrence.parse(self.recurrence) if self.recurrence else None
+        except ValueError:
+            return None
+
+    def anchor_recurrence(self):
+        """Count occurrences from the current due date (today if there is none)"""
+        rule = self.rule
+        self.recurrence = str(rule) if rule else ""
+        if rule is None:
+            self.recurrence_start = ""
+            return
+        if not self.due_date:
+            self.due_date = date.today().strftime(DATE_FORMAT)
+        self.recurrence_start = self.due_date
+
+    def occurrences(self, first: date, last: date) -> Iterator[date]:
+        """Open occurrences due from first to last inclusive
+
+        For a recurring task these are generated from its rule, starting at
+        the current due date; earlier ones have already been completed.
+        """
+        if self.completed or not self.due_date:
+            return
+        try:
+            # Far cheaper than strptime for the YYYY-MM-DD dates stored here
+            due = date.fromisoformat(self.due_date)
+            start = date.fromisoformat(self.recurrence_start or self.due_date)
+        except ValueError:
+            return
+        rule = self.rule
+        if rule is None:
+            if first <= due <= last:
+                yield due
+            return
+        yield from rule.between(start, max(first, due), last)
+
+    def mark_complete(self):
+        rule = self.rule
+        if rule is not None and self.due_date:
+            # Completing a recurring task moves it on to its next occurrence,
+            # skipping any that were missed
+            try:
+                due = datetime.strptime(self.due_date, DATE_FORMAT).date()
+                start = datetime.strptime(self.recurrence_start or self.due_date, DATE_FORMAT).date()
+            except ValueError:
+                pass
+            else:
+                self.due_date = rule.next_after(start, max(due, date.today())).strftime(DATE_FORMAT)
+                return
+        self.completed = True
+        self.completed_at = datetime.now().strftime(TIMESTAMP_FORMAT)
+
+    def mark_incomplete(self):
+        self.completed = False
+        self.completed_at = None
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'title': self.title,
+            'description': self.description,
+            'category': self.category,
+            'priority': self.priority,
+            'due_date': self.due_date,
+            'completed': self.completed,
+            'created_at': self.created_at,
+            'completed_at': self.completed_at,
+            'recurrence': self.recurrence,
+            'recurrence_start': self.recurrence_start,
+            'blocked_by': self.blocked_by
+        }
+
+    def to_record(self) -> Dict:
+        """Like to_dict, but referring to an out-of-line description by key"""
+        if self._description is not None:
+            return self.to_dict()
+        return {
+            'id': self.id,
+            'title': self.title,
+            'description_ref': self.description_ref,
+            'category': self.category,
+            'priority': self.priority,
+            'due_date': self.due_date,
+            'completed': self.completed,
+            'created_at': self.created_at,
+            'completed_at': self.completed_at,
+            'recurrence': self.recurrence,
+            'recurrence_start': self.recurrence_start,
+            'blocked_by': self.blocked_by
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict, descriptions: Optional["DescriptionStore"] = None):
+        task = cls(
+            title=data['title'],
+            description=data.get('description', ''),
+            category=data.get('category', 'General'),
+            priority=data.get('priority', 'Medium'),
+            due_date=data.get('due_date', ''),
+            completed=data.get('completed', False)
+        )
+        task.recurrence = data.get('recurrence', '')
+        task.recurrence_start = data.get('recurrence_start', '')
+        task.blocked_by = list(data.get('blocked_by', []))
+        task.id = data['id']
+        task.created_at = data.get('created_at', datetime.now().strftime(TIMESTAMP_FORMAT))
+        task.completed_at = data.get('completed_at')
+        if data.get('description_ref'):
+            task.detach_description(descriptions, data['description_ref'])
+        return task
+
+
+class DescriptionStore:
+    """Append-only, content-addressed file of long task descriptions
+
+    Each record is ``<sha1> <length>\\n<utf-8 text>\\n``. Only an offset
+    index is kept in memory; the text is read when something asks for it.
+    Identical descriptions are stored once.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._index: Dict[str, tuple] = {}  # key -> (offset, length)
+        self._end = 0  # End of the last complete record indexed
+        self._inode = None
+        self._reader = None  # Open on the file that was indexed, so offsets always match it
+        self._replaced = None  # (reader, index) of the file the last rewrite replaced
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._index)
+
+    @staticmethod
+    def key(text: str) -> str:
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+    def _refresh(self):
+        """Index records appended, or a file rewritten, by any process"""
+        try:
+            # Opened before the stat so the index and reader describe one file
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            f = None
+        stat = os.fstat(f.fileno()) if f is not None else None
+        if stat is None or stat.st_ino != self._inode:
+            self._retire_reader()
+            self._reader = f
+            self._index = {}
+            self._end = 0
+            self._inode = stat.st_ino if stat else None
+        else:
+            if self._reader is None:
+                self._reader = f
+            else:
+                f.close()
+            if stat.st_size < self._end:
+                self._index = {}
+                self._end = 0
+        if stat is None or stat.st_size == self._end:
+            return
+
+        f = self._reader
+        f.seek(self._end)
+        while True:
+            header = f.readline()
+            try:
+                key, length = header.split()
+                length = int(length)
+            except ValueError:
+                break  # End of file, or a writer crashed mid-header
+            offset = f.tell()
+            f.seek(length, os.SEEK_CUR)
+            if f.read(1) != b'\n':
+                break  # A writer crashed mid-record; the next put truncates it
+            self._index[key.decode('ascii')] = (offset, length)
+            self._end = offset + length + 1
+
+    def _retire_reader(self):
+        """Keep the file a rewrite replaced readable for records it dropped"""
+        if self._replaced is not None:
+            self._replaced[0].close()
+            self._replaced = None
+        if self._reader is not None:
+            if self._index:
+                self._replaced = (self._reader, self._index)
+            else:
+                self._reader.close()
+            self._reader = None
+
+    def get(self, key: str) -> str:
+        with self._lock:
+            location = self._index.get(key)
+            if location is None:
+                self._refresh()
+                location = self._index.get(key)
+            reader = self._reader
+            if location is None and self._replaced is not None:
+                reader, index = self._replaced
+                location = index.get(key)
+            if location is None:
+                print(f"Error loading description {key}: not found")
+                return ""
+            offset, length = location
+            reader.seek(offset)
+            return reader.read(length).decode('utf-8')
+
+    def put_many(self, texts: List[str]) -> List[str]:
+        """Store texts and return their keys (file lock must be held)"""
+        keys = [self.key(text) for text in texts]
+        with self._lock:
+            self._refresh()
+            records = []
+            new_keys = set()
+            for key, text in zip(keys, texts):
+                if key in self._index or key in new_keys:
+                    continue
+                new_keys.add(key)
+                data = text.encode('utf-8')
+                records.append((key, f"{key} {len(data)}\n".encode('ascii'), data))
+            if not records:
+                return keys
+
+            with open(self.path, 'ab') as f:
+                # Drop any half-written record left behind by a crashed writer
+                f.truncate(self._end)
+                f.write(b''.join(header + data + b'\n' for _, header, data in records))
+                self._inode = os.fstat(f.fileno()).st_ino
+            if self._reader is None:
+                # The file lock keeps the file from being replaced in between
+                self._reader = open(self.path, 'rb')
+            for key, header, data in records:
+                offset = self._end + len(header)
+                self._index[key] = (offset, len(data))
+                self._end = offset + len(data) + 1
+        return keys
+
+    def search(self, term: str, keys: Set[str]) -> Set[str]:
+        """Those of the given keys whose descriptions contain the (lower case) term"""
+        with self._lock:
+            self._refresh()
+            index = self._index
+            if not index or not keys:
+                return set()
+            reader = self._reader
+            if len(keys) * 4 >= len(index):
+                # Most of the file: one read and a pass in file order beat
+                # a seek per record
+                reader.seek(0)
+                data = reader.read(self._end)
+                return {key for key, (offset, length) in index.items()
+                        if term in data[offset:offset + length].decode('utf-8').lower()} & keys
+            matches = set()
+            for (offset, length), key in sorted((index[key], key) for key in keys if key in index):
+                reader.seek(offset)
+                if term in reader.read(length).decode('utf-8').lower():
+                    matches.add(key)
+            return matches
+
+    def missing(self, keys: Set[str]) -> Set[str]:
+        """Keys with no record in the current file"""
+        with self._lock:
+            self._refresh()
+            return {key for key in keys if key not in self._index}
+
+    def collect(self, live_keys: set):
+        """Rewrite the file without unreferenced records once they are the majority
+
+        The file lock must be held, and ``live_keys`` must cover every saved
+        task; other processes notice the new file and re-index it.
+        """
+        with self._lock:
+            self._refresh()
+            live_bytes = sum(self._index[key][1] for key in live_keys if key in self._index)
+            if self._end <= 2 * live_bytes:
+                return
+            tmp = self.path + ".tmp"
+            with open(self.path, 'rb') as src, open(tmp, 'wb') as dst:
+                for key in live_keys:
+                    if key not in self._index:
+                        continue
+                    offset, length = self._index[key]
+                    src.seek(offset)
+                    dst.write(f"{key} {length}\n".encode('ascii') + src.read(length) + b'\n')
+            os.replace(tmp, self.path)
+            self._refresh()
+
+
+class QueryCache:
+    """Bounded LRU of ordered query results (task ID lists)
+
+    Entries are keyed on (search term, category, priority, status, sort)
+    and are only valid for one store generation; any mutation empties the
+    cache. Both the number of entries and the total number of cached IDs
+    are capped.
+    """
+
+    def __init__(self, capacity: int = 64, max_ids: int = 2000000):
+        self.capacity = capacity
+        self.max_ids = max_ids
+        self.generation = None
+        self.hits = 0
+        self.misses = 0
+        self.refinements = 0
+        self._entries: "OrderedDict[tuple, List[int]]" = OrderedDict()
+        self._id_count = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def validate(self, generation: int):
+        """Drop every entry if the store changed since they were cached"""
+        if generation != self.generation:
+            self.clear()
+            self.generation = generation
+
+    def clear(self):
+        self._entries.clear()
+        self._id_count = 0
+
+    def get(self, key: tuple) -> Optional[List[int]]:
+        ids = self._entries.get(key)
+        if ids is None:
+            self.misses += 1
+            metrics.incr("query_cache.miss")
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        metrics.incr("query_cache.hit")
+        return ids
+
+    def put(self, key: tuple, ids: List[int]):
+        if len(ids) > self.max_ids:
+            return
+        if key in self._entries:
+            self._id_count -= len(self._entries.pop(key))
+        self._entries[key] = ids
+        self._id_count += len(ids)
+        while len(self._entries) > self.capacity or self._id_count > self.max_ids:
+            _, evicted = self._entries.popitem(last=False)
+            self._id_count -= len(evicted)
+
+    def find_refinable(self, key: tuple) -> Optional[List[int]]:
+        """Find the cached result with the longest search prefix of this query"""
+        search_term, filters = key[0], key[1:]
+        best_ids = None
+        best_length = -1
+        for (cached_term, *cached_filters), ids in self._entries.items():
+            if (tuple(cached_filters) == filters
+                    and best_length < len(cached_term) < len(search_term)
+                    and search_term.startswith(cached_term)):
+                best_ids = ids
+                best_length = len(cached_term)
+        if best_ids is not None:
+            self.refinements += 1
+            metrics.incr("query_cache.refinement")
+        return best_ids
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'cached_ids': self._id_count,
+            'hits': self.hits,
+            'misses': self.misses,
+            'refinements': self.refinements,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+
+# Field names accepted by the query language, with their short forms
+QUERY_FIELDS = {'category': 'category', 'cat': 'category', 'priority': 'priority', 'pri': 'priority',
+                'status': 'status', 'is': 'status', 'due': 'due'}
+QUERY_TOKEN = re.compile(r'(\w+):("[^"]*"|\S+)|"([^"]*)"|(\S+)')
+QUERY_OPERATOR = re.compile(r'(>=|<=|>|<|=)?(.*)')
+
+
+class IndexTerm:
+    """Condition answered by the hash index on one field: any of ``values``"""
+
+    indexed = True
+
+    def __init__(self, label: str, field: str, values):
+        self.label = label
+        self.field = field
+        self.values = frozenset(values)
+
+    def estimate(self, index: "TaskIndex") -> int:
+        buckets = index.buckets[self.field]
+        return sum(len(buckets.get(value, ())) for value in self.values)
+
+    def ids(self, index: "TaskIndex") -> Set[int]:
+        buckets = index.buckets[self.field]
+        if len(self.values) == 1:
+            return buckets.get(next(iter(self.values)), set())
+        return set().union(*(buckets.get(value, ()) for value in self.values))
+
+    def filter(self, store: "TaskStore", tasks: List[Task]) -> List[Task]:
+        field, values = self.field, self.values
+        return [task for task in tasks if getattr(task, field) in values]
+
+    def matches(self, store: "TaskStore", task: Task) -> bool:
+        return getattr(task, self.field) in self.values
+
+
+class DueTerm:
+    """Comparisons against the due date, answered by the sorted due-date index
+
+    ``day`` None matches tasks without a due date. Terms for one query are
+    merged with ``combine`` so a range costs a single slice of the index.
+    """
+
+    indexed = True
+
+    def __init__(self, label: str, operator: str, day: Optional[str]):
+        self.label = label
+        self.day = day
+        self.bounds = [(operator, day)]
+
+    def combine(self, other: "DueTerm"):
+        self.label += " " + other.label
+        self.bounds.extend(other.bounds)
+
+    def _range(self, index: "TaskIndex") -> Tuple[int, int]:
+        dates = index.due_dates
+        start, end = 0, len(dates)
+        for operator, day in self.bounds:
+            if operator in ('<', '<='):
+                end = min(end, (bisect.bisect_left if operator == '<' else bisect.bisect_right)(dates, day))
+            elif operator in ('>', '>='):
+                start = max(start, (bisect.bisect_right if operator == '>' else bisect.bisect_left)(dates, day))
+            else:
+                start = max(start, bisect.bisect_left(dates, day))
+                end = min(end, bisect.bisect_right(dates, day))
+        return start, max(start, end)
+
+    def estimate(self, index: "TaskIndex") -> int:
+        if self.day is None:
+            return len(index.no_due)
+        start, end = self._range(index)
+        return end - start
+
+    def ids(self, index: "TaskIndex") -> Set[int]:
+        if self.day is None:
+            return index.no_due
+        start, end = self._range(index)
+        return set(index.due_ids[start:end])
+
+    def filter(self, store: "TaskStore", tasks: List[Task]) -> List[Task]:
+        if self.day is None:
+            return [task for task in tasks if not task.due_date]
+        return [task for task in tasks if self.matches(store, task)]
+
+    COMPARE = {'<': str.__lt__, '<=': str.__le__, '>': str.__gt__, '>=': str.__ge__, '=': str.__eq__}
+
+    def matches(self, store: "TaskStore", task: Task) -> bool:
+        if self.day is None:
+            return not task.due_date
+        return bool(task.due_date) and all(self.COMPARE[operator](task.due_date, day)
+                                           for operator, day in self.bounds)
+
+
+class TextTerm:
+    """Substring of the title or description; no index, checked row by row"""
+
+    indexed = False
+    selectivity = 0.1  # Guess used for estimates
+
+    def __init__(self, text: str):
+        self.label = f'"{text}"'
+        self.text = text.lower()
+
+    def filter(self, store: "TaskStore", tasks: List[Task]) -> List[Task]:
+        return store._search(tasks, self.text)
+
+    def matches(self, store: "TaskStore", task: Task) -> bool:
+        return self.text in task.title.lower() or self.text in task.description.lower()
+
+
+class ReadinessTerm:
+    """Pending tasks that are (or are not) waiting for an open blocker"""
+
+    indexed = False
+    selectivity = 0.5
+
+    def __init__(self, label: str, blocked: bool):
+        self.label = label
+        self.blocked = blocked
+
+    def filter(self, store: "TaskStore", tasks: List[Task]) -> List[Task]:
+        open_blockers = store.dependencies.open_blockers
+        blocked = self.blocked
+        return [task for task in tasks
+                if not task.completed and (open_blockers.get(task.id, 0) > 0) == blocked]
+
+    def matches(self, store: "TaskStore", task: Task) -> bool:
+        return (not task.completed
+                and (store.dependencies.open_blockers.get(task.id, 0) > 0) == self.blocked)
+
+
+def _query_values(field: str, value: str, choices: List[str]) -> List[str]:
+    by_name = {choice.lower(): choice for choice in choices}
+    values = []
+    for name in value.split(','):
+        if name.lower() not in by_name:
+            raise ValueError(f"Unknown {field}: {name}")
+        values.append(by_name[name.lower()])
+    return values
+
+
+def _query_term(field: str, value: str, label: str) -> List:
+    operator, value = QUERY_OPERATOR.fullmatch(value).groups()
+    operator = operator or '='
+    if not value:
+        raise ValueError(f"Missing value in {label}")
+    if field in ('category', 'status') and operator != '=':
+        raise ValueError(f"{field} only supports equality: {label}")
+
+    if field == 'category':
+        return [IndexTerm(label, 'category', _query_values(field, value, CATEGORIES))]
+
+    if field == 'priority':
+        if operator == '=':
+            return [IndexTerm(label, 'priority', _query_values(field, value, PRIORITIES))]
+        # PRIORITIES runs from lowest to highest
+        rank = PRIORITIES.index(_query_values(field, value, PRIORITIES)[0])
+        ranks = {'<': range(rank), '<=': range(rank + 1),
+                 '>': range(rank + 1, len(PRIORITIES)), '>=': range(rank, len(PRIORITIES))}[operator]
+        return [IndexTerm(label, 'priority', [PRIORITIES[r] for r in ranks])]
+
+    if field == 'status':
+        status = value.lower()
+        if status in ('completed', 'done'):
+            return [IndexTerm(label, 'completed', [True])]
+        if status in ('pending', 'open'):
+            return [IndexTerm(label, 'completed', [False])]
+        if status in ('ready', 'blocked'):
+            return [IndexTerm(label, 'completed', [False]), ReadinessTerm(label, status == 'blocked')]
+        if status == 'overdue':
+            return [IndexTerm(label, 'completed', [False]),
+                    DueTerm(label, '<', date.today().strftime(DATE_FORMAT))]
+        if status == 'all':
+            return []
+        raise ValueError(f"Unknown status: {value}")
+
+    # due
+    if value.lower() == 'none':
+        if operator != '=':
+            raise ValueError(f"due:none does not take a comparison: {label}")
+        return [DueTerm(label, '=', None)]
+    if value.lower() == 'today':
+        value = date.today().strftime(DATE_FORMAT)
+    elif not validate_due_date(value):
+        raise ValueError(f"Invalid date in {label}; use YYYY-MM-DD")
+    return [DueTerm(label, operator, value)]
+
+
+def parse_query(text: str) -> Optional[List]:
+    """Parse a structured search such as ``priority:>=High due:<2026-11-01 "invoice"``
+
+    Returns None for plain text without field conditions or quotes, which
+    keeps its usual meaning of one substring search. Otherwise every
+    condition must hold; unquoted words are separate substring searches.
+    Raises ValueError for unknown values or malformed dates.
+    """
+    tokens = QUERY_TOKEN.findall(text)
+    if not any(name.lower() in QUERY_FIELDS or phrase for name, _, phrase, _ in tokens):
+        return None
+    terms = []
+    for name, value, phrase, word in tokens:
+        if name and name.lower() in QUERY_FIELDS:
+            terms.extend(_query_term(QUERY_FIELDS[name.lower()], value.strip('"'), f"{name}:{value}"))
+        elif name:
+            terms.append(TextTerm(f"{name}:{value}"))
+        elif phrase or word:
+            terms.append(TextTerm(phrase or word))
+    return merge_due_terms(terms)
+
+
+def merge_due_terms(terms: List) -> List:
+    """Fold every due date comparison into the first one, making it a range"""
+    merged = []
+    dated = None
+    for term in terms:
+        if isinstance(term, DueTerm) and term.day is not None:
+            if dated is not None:
+                dated.combine(term)
+                continue
+            dated = term
+        merged.append(term)
+    return merged
+
+
+def filter_terms(category: str = "All", priority: str = "All", status: str = "All") -> List:
+    """Conditions equivalent to the category, priority and status filters"""
+    terms = []
+    if category != "All":
+        terms.append(IndexTerm(f"category={category}", 'category', [category]))
+    if priority != "All":
+        terms.append(IndexTerm(f"priority={priority}", 'priority', [priority]))
+    if status != "All":
+        terms.extend(_query_term('status', status, f"status={status}"))
+    return terms
+
+
+def format_plan(steps: List[Dict]) -> str:
+    """Render the steps returned by TaskStore.explain() as a table"""
+    lines = [f"{'#':>2}  {'Operation':<10} {'Condition':<32} {'Estimated':>10} {'Actual':>10}"]
+    for number, step in enumerate(steps, 1):
+        lines.append(f"{number:>2}  {step['operation']:<10} {step['condition']:<32} "
+                     f"{step['estimated']:>10} {step['actual']:>10}")
+    return "\n".join(lines)
+
+
+class TaskIndex:
+    """Hash indexes on category, priority and completion plus a sorted due-date index
+
+    Nothing is built until the first structured query or date range lookup;
+    after that the indexes follow store changes. Large batches of changes,
+    and full reloads, leave the affected index to be rebuilt on next use.
+    Recurring tasks are also kept in a set of their own, since they can
+    fall due in any window after their due date.
+    """
+
+    FIELDS = ('category', 'priority', 'completed')
+    BULK_CHANGE = 1000  # Beyond this many changes the due-date list is re-sorted
+
+    def __init__(self, store: "TaskStore"):
+        self.store = store
+        self.buckets: Dict[str, Dict] = {field: {} for field in self.FIELDS}
+        self.due_dates: List[str] = []  # Sorted, parallel to due_ids
+        self.due_ids: List[int] = []
+        self.no_due: Set[int] = set()
+        self.recurring: Set[int] = set()
+        # Task ID -> (category, priority, completed, due_date, recurring)
+        self._keys: Dict[int, tuple] = {}
+        self._stale = True
+        self._due_stale = False
+        store.subscribe(self.on_change)
+
+    def __len__(self):
+        return len(self._keys)
+
+    @staticmethod
+    def _key(task: Task) -> tuple:
+        return (task.category, task.priority, task.completed, task.due_date, bool(task.recurrence))
+
+    def on_change(self, tasks, removed=False):
+        """Store listener: move changed tasks between buckets"""
+        if self._stale:
+            return
+        if tasks is None:
+            self._stale = True
+            return
+        if len(tasks) > self.BULK_CHANGE:
+            self._due_stale = True
+        for task in tasks:
+            old = self._keys.pop(task.id, None)
+            new = None if removed else self._key(task)
+            if old == new:
+                if new is not None:
+                    self._keys[task.id] = new
+                continue
+            if old is not None:
+                self._unindex(task.id, old)
+            if new is not None:
+                self._keys[task.id] = new
+                self._index(task.id, new)
+
+    def _unindex(self, task_id: int, key: tuple):
+        for field, value in zip(self.FIELDS, key):
+            bucket = self.buckets[field][value]
+            bucket.discard(task_id)
+            if not bucket:
+                del self.buckets[field][value]
+        if key[4]:
+            self.recurring.discard(task_id)
+        if not key[3]:
+            self.no_due.discard(task_id)
+        elif not self._due_stale:
+            start = bisect.bisect_left(self.due_dates, key[3])
+            position = self.due_ids.index(task_id, start, bisect.bisect_right(self.due_dates, key[3]))
+            del self.due_dates[position]
+            del self.due_ids[position]
+
+    def _index(self, task_id: int, key: tuple):
+        for field, value in zip(self.FIELDS, key):
+            self.buckets[field].setdefault(value, set()).add(task_id)
+        if key[4]:
+            self.recurring.add(task_id)
+        if not key[3]:
+            self.no_due.add(task_id)
+        elif not self._due_stale:
+            position = bisect.bisect_right(self.due_dates, key[3])
+            self.due_dates.insert(position, key[3])
+            self.due_ids.insert(position, task_id)
+
+    def ensure(self):
+        """Build whatever is missing or out of date"""
+        if self._stale:
+            self.rebuild()
+        elif self._due_stale:
+            self._rebuild_due()
+
+    @metrics.timed("store.index_build")
+    def rebuild(self):
+        key = self._key
+        self._keys = {task.id: key(task) for task in self.store.tasks}
+        for position, field in enumerate(self.FIELDS):
+            buckets = self.buckets[field] = {}
+            for task_id, values in self._keys.items():
+                value = values[position]
+                if value in buckets:
+                    buckets[value].add(task_id)
+                else:
+                    buckets[value] = {task_id}
+        self.recurring = {task_id for task_id, values in self._keys.items() if values[4]}
+        self._rebuild_due()
+        self._stale = False
+
+    def due_between(self, first: str, last: str) -> List[int]:
+        """IDs of tasks due from first to last inclusive, in due date order
+
+        Two binary searches and a slice: O(log n + k) for k results.
+        """
+        self.ensure()
+        start = bisect.bisect_left(self.due_dates, first)
+        return self.due_ids[start:bisect.bisect_right(self.due_dates, last, start)]
+
+    def _rebuild_due(self):
+        dated = sorted((values[3], task_id) for task_id, values in self._keys.items() if values[3])
+        self.due_dates = [day for day, _ in dated]
+        self.due_ids = [task_id for _, task_id in dated]
+        self.no_due = {task_id for task_id, values in self._keys.items() if not values[3]}
+        self._due_stale = False
+
+
+class SavedView:
+    """A named search plus filters whose matching task IDs are kept up to date"""
+
+    def __init__(self, name: str, search: str = "", category: str = "All",
+                 priority: str = "All", status: str = "All"):
+        self.name = name
+        self.search = search
+        self.category = category
+        self.priority = priority
+        self.status = status
+        self.ids: Optional[Set[int]] = None  # None until first materialized
+        self.terms: List = []
+        self.completed_only = False
+        self._day = None  # Date the terms were built for (status:overdue uses it)
+        self._sorted: Optional[List[Task]] = None
+
+    @property
+    def key(self) -> tuple:
+        return (self.search.lower(), self.category, self.priority, self.status)
+
+    def build_terms(self) -> List:
+        """Conditions of the view; raises ValueError for an invalid query"""
+        terms = parse_query(self.search)
+        if terms is None:
+            terms = [TextTerm(self.search)] if self.search else []
+        return merge_due_terms(terms + filter_terms(self.category, self.priority, self.status))
+
+    def matches(self, store: "TaskStore", task: Task) -> bool:
+        return all(term.matches(store, task) for term in self.terms)
+
+    def to_dict(self) -> Dict:
+        return {'name': self.name, 'search': self.search, 'category': self.category,
+                'priority': self.priority, 'status': self.status}
+
+
+class SavedViews:
+    """Saved views with their results materialized and maintained incrementally
+
+    Each view holds the set of IDs it matches. A store change re-tests only
+    the changed tasks against each view, so opening a view or showing its
+    count never rescans the tasks. Views are stored in ``<data file>.views``.
+    """
+
+    def __init__(self, store: "TaskStore"):
+        self.store = store
+        self.path = store.data_file + ".views"
+        self.views: Dict[str, SavedView] = {}
+        self._stamp = None
+        store.subscribe(self.on_change)
+
+    def __iter__(self):
+        return iter(list(self.views.values()))
+
+    def __len__(self):
+        return len(self.views)
+
+    def get(self, name: str) -> Optional[SavedView]:
+        self.refresh()
+        return self.views.get(name)
+
+    def refresh(self):
+        """Re-read the views file if another process changed it"""
+        try:
+            stamp = os.stat(self.path).st_mtime_ns
+        except OSError:
+            stamp = None
+        if stamp == self._stamp:
+            return
+        self._stamp = stamp
+        views = {}
+        if stamp is not None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    for data in json.load(f):
+                        view = SavedView(**data)
+                        old = self.views.get(view.name)
+                        # An unchanged definition keeps its materialized result
+                        views[view.name] = old if old is not None and old.to_dict() == data else view
+            except (OSError, ValueError, TypeError) as e:
+                print(f"Error loading saved views: {e}")
+                return
+        self.views = views
+
+    def _write(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump([view.to_dict() for view in self.views.values()], f, indent=2)
+        os.replace(tmp, self.path)
+        self._stamp = os.stat(self.path).st_mtime_ns
+
+    def save(self, name: str, search: str = "", category: str = "All", priority: str = "All",
+             status: str = "All") -> SavedView:
+        """Create or replace a view; raises ValueError for a bad name or query"""
+        name = name.strip()
+        if not name:
+            raise ValueError("View name is required")
+        if status not in STATUSES:
+            raise ValueError(f"Unknown status: {status}")
+        view = SavedView(name, search, category, priority, status)
+        view.build_terms()
+        with self.store.lock, self.store.file_lock:
+            self.refresh()
+            self.views[name] = view
+            self._write()
+        return view
+
+    def delete(self, name: str) -> bool:
+        with self.store.lock, self.store.file_lock:
+            self.refresh()
+            if self.views.pop(name, None) is None:
+                return False
+            self._write()
+        return True
+
+    def find(self, key: tuple) -> Optional[SavedView]:
+        """The view defined by exactly this (search, category, priority, status)"""
+        for view in self.views.values():
+            if view.key == key:
+                return view
+        return None
+
+    def ensure(self, view: SavedView):
+        """Materialize a view that has no result yet, or whose day has passed"""
+        today = date.today()
+        store = self.store
+        with store.lock:
+            if view.completed_only:
+                # Only stats the segments; a re-read drops the result below
+                store._archived_by_id()
+            if view.ids is not None and view._day == today:
+                return
+            view.terms = view.build_terms()
+            view.completed_only = store._completed_only(view.terms)
+            if view.completed_only:
+                store._archived_by_id()
+            tasks = store._plan(view.terms, view.completed_only)[0]
+            view.ids = {task.id for task in tasks}
+            view._day = today
+            view._sorted = None
+            metrics.incr("views.materialized")
+
+    def count(self, name: str) -> int:
+        view = self.get(name)
+        if view is None:
+            raise ValueError(f"No saved view named {name}")
+        with self.store.lock:
+            self.ensure(view)
+            return len(view.ids)
+
+    def tasks(self, name: str, sort: bool = True) -> List[Task]:
+        """Tasks in a view, from its maintained result"""
+        view = self.get(name)
+        if view is None:
+            raise ValueError(f"No saved view named {name}")
+        return self.results(view, sort)
+
+    def results(self, view: SavedView, sort: bool = True) -> List[Task]:
+        store = self.store
+        with store.lock:
+            self.ensure(view)
+            if view._sorted is None:
+                by_id = store._by_id
+                archive = store._archive if view.completed_only else None
+                tasks = [by_id.get(task_id) or archive[task_id] for task_id in view.ids]
+                tasks.sort(key=task_sort_key)
+                view._sorted = tasks
+            return list(view._sorted) if sort else sorted(view._sorted, key=lambda task: task.id)
+
+    def archive_reloaded(self):
+        """Drop results that include the archive once it has been re-read from disk"""
+        for view in self.views.values():
+            if view.completed_only:
+                view.ids = None
+                view._sorted = None
+
+    def on_change(self, tasks, removed=False):
+        """Store listener: re-test changed tasks against every materialized view"""
+        if tasks is None:
+            for view in self.views.values():
+                view.ids = None
+            return
+        store = self.store
+        for view in self.views.values():
+            ids = view.ids
+            if ids is None:
+                continue
+            changed = False
+            for task in tasks:
+                if removed:
+                    # Archiving keeps completed tasks in views that include the archive
+                    keep = view.completed_only and store._is_archived(task.id)
+                    inside = keep
+                else:
+                    inside = view.matches(store, task)
+                if inside != (task.id in ids):
+                    changed = True
+                    if inside:
+                        ids.add(task.id)
+                    else:
+                        ids.discard(task.id)
+                elif inside:
+                    changed = True  # Still matches, but its position in the order may have moved
+            if changed:
+                view._sorted = None
+
+
+class DependencyGraph:
+    """"Blocked by" relations between tasks, with readiness kept up to date
+
+    Each task lists the IDs it waits for in ``blocked_by``. The graph keeps
+    the reverse edges and, for every pending task, how many of its blockers
+    are still open; a change only touches the changed task's neighbours.
+    Blockers that are completed, deleted or archived no longer block.
+    """
+
+    def __init__(self, store: "TaskStore"):
+        self.store = store
+        self.blockers: Dict[int, Set[int]] = {}
+        self.dependents: Dict[int, Set[int]] = {}
+        self.open_blockers: Dict[int, int] = {}  # Pending task ID -> open blocker count
+        self._open: Set[int] = set()  # IDs of pending tasks
+        self._critical_path = (None, [])  # (store generation, tasks)
+        store.subscribe(self.on_change)
+
+    def on_change(self, tasks, removed=False):
+        """Store listener: apply changed tasks, then report readiness flips"""
+        if tasks is None:
+            self.rebuild()
+            return
+        changed = {task.id for task in tasks}
+        flipped = set()
+        for task in tasks:
+            if removed:
+                self._remove(task, flipped)
+            else:
+                self._update(task, flipped)
+
+        # A completed blocker changes how its dependents are shown and filtered
+        flipped -= changed
+        if flipped:
+            by_id = self.store._by_id
+            self.store._notify([by_id[task_id] for task_id in flipped if task_id in by_id])
+
+    def rebuild(self):
+        tasks = self.store.tasks
+        blockers = {}
+        dependents = {}
+        for task in tasks:
+            if task.blocked_by:
+                edges = set(task.blocked_by)
+                edges.discard(task.id)
+                if edges:
+                    blockers[task.id] = edges
+                    for blocker in edges:
+                        if blocker in dependents:
+                            dependents[blocker].add(task.id)
+                        else:
+                            dependents[blocker] = {task.id}
+        self.blockers = blockers
+        self.dependents = dependents
+        self._open = is_open = {task.id for task in tasks if not task.completed}
+        self.open_blockers = {
+            task.id: len(blockers[task.id] & is_open) if task.id in blockers else 0
+            for task in tasks if not task.completed
+        }
+
+    def _set_edges(self, task: Task):
+        task_id = task.id
+        new = {blocker for blocker in task.blocked_by if blocker != task_id}
+        old = self.blockers.get(task_id, set())
+        if new == old:
+            return
+        for blocker in old - new:
+            dependents = self.dependents[blocker]
+            dependents.discard(task_id)
+            if not dependents:
+                del self.dependents[blocker]
+        for blocker in new - old:
+            self.dependents.setdefault(blocker, set()).add(task_id)
+        if new:
+            self.blockers[task_id] = new
+        else:
+            self.blockers.pop(task_id, None)
+
+    def _count_open(self, task_id: int) -> int:
+        return sum(1 for blocker in self.blockers.get(task_id, ()) if blocker in self._open)
+
+    def _shift(self, task_id: int, delta: int, flipped: Set[int]):
+        """Adjust the open blocker counts of a task's dependents"""
+        for dependent in self.dependents.get(task_id, ()):
+            count = self.open_blockers.get(dependent)
+            if count is None:
+                continue  # Completed tasks are not tracked
+            self.open_blockers[dependent] = count + delta
+            if (count == 0) != (count + delta == 0):
+                flipped.add(dependent)
+
+    def _update(self, task: Task, flipped: Set[int]):
+        task_id = task.id
+        self._set_edges(task)
+        is_open = not task.completed
+        if is_open != (task_id in self._open):
+            if is_open:
+                self._open.add(task_id)
+            else:
+                self._open.discard(task_id)
+            self._shift(task_id, 1 if is_open else -1, flipped)
+        if is_open:
+            self.open_blockers[task_id] = self._count_open(task_id)
+        else:
+            self.open_blockers.pop(task_id, None)
+
+    def _remove(self, task: Task, flipped: Set[int]):
+        task_id = task.id
+        if task_id in self._open:
+            self._open.discard(task_id)
+            self._shift(task_id, -1, flipped)
+        self.open_blockers.pop(task_id, None)
+        # Dependents keep their edges, so restoring the task blocks them again
+        for blocker in self.blockers.pop(task_id, ()):
+            dependents = self.dependents[blocker]
+            dependents.discard(task_id)
+            if not dependents:
+                del self.dependents[blocker]
+
+    def is_blocked(self, task: Task) -> bool:
+        return self.open_blockers.get(task.id, 0) > 0
+
+    def open_blockers_of(self, task: Task) -> List[Task]:
+        """The tasks this task is still waiting for"""
+        by_id = self.store._by_id
+        return [by_id[blocker] for blocker in self.blockers.get(task.id, ()) if blocker in self._open]
+
+    def check(self, task: Task, blocker_ids: Iterable[int], planned: Optional[Dict] = None):
+        """Raise ValueError unless task may wait for all of blocker_ids
+
+        ``planned`` maps task IDs to blocker lists that will replace the
+        current ones, so a series of edits can be checked before any is made.
+        """
+        planned = planned or {}
+
+        def upstream_of(task_id):
+            return planned[task_id] if task_id in planned else self.blockers.get(task_id, ())
+
+        for blocker in blocker_ids:
+            if blocker == task.id:
+                raise ValueError("A task cannot be blocked by itself")
+            if blocker in upstream_of(task.id):
+                # Existing edges stay valid after their blocker is deleted or archived
+                continue
+            if blocker not in self.store._by_id:
+                raise ValueError(f"No task with ID {blocker}")
+            # The new edge closes a cycle if the blocker already waits for task
+            seen = {blocker}
+            stack = [blocker]
+            while stack:
+                for upstream in upstream_of(stack.pop()):
+                    if upstream == task.id:
+                        raise ValueError(f"'{self.store._by_id[blocker].title}' already waits for "
+                                         f"'{task.title}'; blocking it would create a cycle")
+                    if upstream not in seen:
+                        seen.add(upstream)
+                        stack.append(upstream)
+
+    def next_actions(self, limit: Optional[int] = None) -> List[Task]:
+        """Pending tasks in an order that puts every blocker before its dependents
+
+        Among the tasks available at each step the usual list order
+        (priority, then due date) decides. Ready tasks therefore come first.
+        Tasks caught in a dependency cycle are left out.
+        """
+        by_id = self.store._by_id
+        remaining = dict(self.open_blockers)
+        heap = [(task_sort_key(by_id[task_id]), task_id)
+                for task_id, count in remaining.items() if count == 0]
+        heapq.heapify(heap)
+        order = []
+        while heap and (limit is None or len(order) < limit):
+            _, task_id = heapq.heappop(heap)
+            order.append(by_id[task_id])
+            for dependent in self.dependents.get(task_id, ()):
+                if dependent in remaining:
+                    remaining[dependent] -= 1
+                    if remaining[dependent] == 0:
+                        heapq.heappush(heap, (task_sort_key(by_id[dependent]), dependent))
+        return order
+
+    @metrics.timed("dependencies.critical_path")
+    def critical_path(self) -> List[Task]:
+        """Longest chain of pending tasks that must be done one after another"""
+        generation, path = self._critical_path
+        if generation == self.store.generation:
+            return path
+
+        by_id = self.store._by_id
+        remaining = dict(self.open_blockers)
+        length = dict.fromkeys(remaining, 1)
+        previous = {}
+        queue = deque(task_id for task_id, count in remaining.items() if count == 0)
+        while queue:
+            task_id = queue.popleft()
+            for dependent in self.dependents.get(task_id, ()):
+                if dependent not in remaining:
+                    continue
+                if length[task_id] + 1 > length[dependent]:
+                    length[dependent] = length[task_id] + 1
+                    previous[dependent] = task_id
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    queue.append(dependent)
+
+        path = []
+        if length:
+            task_id = max(length, key=length.get)
+            while task_id is not None:
+                path.append(by_id[task_id])
+                task_id = previous.get(task_id)
+            path.reverse()
+        self._critical_path = (self.store.generation, path)
+        return path
+
+
+class UndoHistory:
+    """Undo and redo stacks of inverse deltas
+
+    An entry is a label plus a list of deltas, each ``('add', tasks)``,
+    ``('remove', tasks)`` or ``('edit', [(task, old_fields)])``. Task
+    objects are shared with the store instead of copied and edits keep only
+    the fields they changed, so undoing a 100k-task import needs one list of
+    references. Entries past ``limit`` or the estimated ``budget`` in bytes
+    are dropped oldest first; the newest entry is always kept.
+    """
+
+    TASK_BYTES = 600  # Rough size of a Task object without its strings
+
+    def __init__(self, budget: int = UNDO_MEMORY_BUDGET, limit: int = UNDO_LIMIT):
+        self.budget = budget
+        self.limit = limit
+        self.undo_entries = deque()
+        self.redo_entries = []
+        self.size = 0  # Estimated bytes held by both stacks
+
+    @classmethod
+    def estimate(cls, deltas: List[tuple]) -> int:
+        size = 0
+        for kind, payload in deltas:
+            if kind == 'add':
+                size += 8 * len(payload)  # The tasks themselves live in the store
+            elif kind == 'remove':
+                size += sum(cls.TASK_BYTES + len(task.title) + len(task._description or '')
+                            for task in payload)
+            else:
+                size += sum(cls.TASK_BYTES // 4 + sum(len(str(value)) for value in fields.values())
+                            for _, fields in payload)
+        return size
+
+    def record(self, label: str, deltas: List[tuple]):
+        """Add a new change; it makes everything undone so far unredoable"""
+        for entry in self.redo_entries:
+            self.size -= entry[2]
+        self.redo_entries = []
+        self.push_undo(label, deltas)
+
+    def push_undo(self, label: str, deltas: List[tuple]):
+        entry = (label, deltas, self.estimate(deltas))
+        self.undo_entries.append(entry)
+        self.size += entry[2]
+        self._trim(keep=1)
+
+    def push_redo(self, label: str, deltas: List[tuple]):
+        entry = (label, deltas, self.estimate(deltas))
+        self.redo_entries.append(entry)
+        self.size += entry[2]
+        self._trim(keep=0)
+
+    def _trim(self, keep: int):
+        while len(self.undo_entries) > keep and (len(self.undo_entries) > self.limit or self.size > self.budget):
+            self.size -= self.undo_entries.popleft()[2]
+            metrics.incr("history.dropped")
+
+    def pop_undo(self) -> Optional[tuple]:
+        if not self.undo_entries:
+            return None
+        label, deltas, size = self.undo_entries.pop()
+        self.size -= size
+        return label, deltas
+
+    def pop_redo(self) -> Optional[tuple]:
+        if not self.redo_entries:
+            return None
+        label, deltas, size = self.redo_entries.pop()
+        self.size -= size
+        return label, deltas
+
+    @property
+    def undo_label(self) -> Optional[str]:
+        return self.undo_entries[-1][0] if self.undo_entries else None
+
+    @property
+    def redo_label(self) -> Optional[str]:
+        return self.redo_entries[-1][0] if self.redo_entries else None
+
+    def clear(self):
+        self.undo_entries.clear()
+        self.redo_entries = []
+        self.size = 0
+
+
+def describe_tasks(verb: str, tasks: List[Task]) -> str:
+    """Undo label naming a single task by its title and several by their count"""
+    if len(tasks) == 1:
+        return f"{verb} '{tasks[0].title}'"
+    return f"{verb} {len(tasks)} tasks"
+
+
+class TaskStore:
+    """In-memory task collection with JSON persistence
+
+    Several processes may share one data file. ``tasks.json`` holds a
+    snapshot and ``tasks.json.journal`` the changes made since; every save
+    takes an exclusive file lock, merges entries other processes appended
+    and then appends only this process's own changes. The journal is folded
+    back into the snapshot once it grows past ``COMPACT_THRESHOLD`` entries.
+    Descriptions longer than ``INLINE_DESCRIPTION_LIMIT`` are saved to
+    ``tasks.json.descriptions`` and only read when asked for.
+    """
+
+    EDITABLE_FIELDS = ('title', 'description', 'category', 'priority', 'due_date', 'recurrence',
+                       'blocked_by')
+    COMPACT_THRESHOLD = 5000
+
+    def __init__(self, data_file: str = "tasks.json"):
+        self.data_file = data_file
+        self.journal_file = data_file + ".journal"
+        self.file_lock = FileLock(data_file + ".lock")
+        self.archive_dir = data_file + ".archive"
+        self.archive_after_days = ARCHIVE_AFTER_DAYS
+        self.descriptions = DescriptionStore(data_file + ".descriptions")
+        self.tasks: List[Task] = []
+        self._by_id: Dict[int, Task] = {}
+
+        # Bumped on every mutation so views can tell when they are stale
+        self.generation = 0
+        self.query_cache = QueryCache()
+
+        # Guards the task list against the auto-save thread and servers
+        self.lock = threading.RLock()
+        self._batch_depth = 0
+        self._dirty = False
+
+        # Changes not yet journaled: task ID -> task, or None when deleted
+        self._pending: Dict[int, Optional[Task]] = {}
+
+        # Called as listener(tasks, removed) after every change
+        self._listeners: List[Callable] = []
+        self.dependencies = DependencyGraph(self)
+        self.index = TaskIndex(self)
+        self.views = SavedViews(self)
+
+        # Inverse deltas for undo; changes are collected in _undo_group
+        # while a group (or batch) is open
+        self.history = UndoHistory()
+        self._undo_group: Optional[List[tuple]] = None
+        self._history_paused = 0
+
+        # Archived tasks, read from disk only when first needed
+        self._archive: Optional[Dict[int, Task]] = None
+        self._archive_segment: Dict[int, str] = {}
+        self._archive_stamp = None
+
+        # How much of the shared files this process has already seen
+        self._file_generation = 0
+        self._journal_offset = 0
+        self._journal_entries = 0
+        self._journal_stamp = None
+
+    def __len__(self):
+        return len(self.tasks)
+
+    def get(self, task_id, include_archive: bool = False) -> Optional[Task]:
+        """Look up a task by ID (accepts ints or their string form)"""
+        try:
+            task_id = int(task_id)
+        except (TypeError, ValueError):
+            return None
+        task = self._by_id.get(task_id)
+        if task is None and include_archive:
+            task = self._archived_by_id().get(task_id)
+        return task
+
+    def subscribe(self, listener: Callable):
+        """Register listener(tasks, removed) to be called after every change
+
+        ``tasks`` lists the added or edited tasks (or the deleted ones when
+        ``removed`` is true); it is None when the whole store was reloaded.
+        Tasks whose blockers were completed or deleted are reported as
+        edited, since their readiness changed.
+        """
+        self._listeners.append(listener)
+
+    def _notify(self, tasks: Optional[List[Task]], removed: bool = False):
+        for listener in self._listeners:
+            listener(tasks, removed)
+
+    def _changed(self, tasks: Iterable[Task], removed: bool = False):
+        """Record that tasks were added, edited or removed"""
+        tasks = list(tasks)
+        for task in tasks:
+            self._pending[task.id] = None if removed else task
+        self.generation += 1
+        self._dirty = True
+        self._notify(tasks, removed)
+
+    def add(self, task: Task) -> Task:
+        """Add a single task"""
+        return self.add_many([task])[0]
+
+    def add_many(self, tasks: List[Task]) -> List[Task]:
+        """Add several tasks as one change"""
+        with self.lock:
+            for task in tasks:
+                while task.id in self._by_id:
+                    task.id = new_task_id()
+                self.tasks.append(task)
+                self._by_id[task.id] = task
+            self._changed(tasks)
+            if tasks:
+                self._record(describe_tasks("Add", tasks), ('add', list(tasks)))
+        return tasks
+
+    def update(self, task: Task, **fields) -> Task:
+        """Change editable fields of a task"""
+        self.update_many([task], **fields)
+        return task
+
+    def update_many(self, tasks: Iterable[Task], **fields) -> List[Task]:
+        """Give several tasks the same field values as one change"""
+        for name in fields:
+            if name not in self.EDITABLE_FIELDS:
+                raise ValueError(f"Unknown task field: {name}")
+        with self.lock:
+            tasks = list(tasks)
+            if 'blocked_by' in fields:
+                fields['blocked_by'] = [int(blocker) for blocker in fields['blocked_by']]
+                planned = {}
+                for task in tasks:
+                    self.dependencies.check(task, fields['blocked_by'], planned)
+                    planned[task.id] = fields['blocked_by']
+            tasks = self._unarchive_many(tasks)
+            if not tasks:
+                return tasks
+            label = describe_tasks("Edit", tasks)
+            edits = []
+            for task in tasks:
+                old_fields = {name: getattr(task, name) for name in fields}
+                old_fields['recurrence_start'] = task.recurrence_start
+                reanchor = any(getattr(task, name) != fields[name]
+                               for name in ('due_date', 'recurrence') if name in fields)
+                for name, value in fields.items():
+                    # Tasks must not share one mutable blocker list
+                    setattr(task, name, list(value) if name == 'blocked_by' else value)
+                if reanchor:
+                    task.anchor_recurrence()
+                edits.append((task, old_fields))
+            self._changed(tasks)
+            self._record(label, ('edit', edits))
+        return tasks
+
+    def set_completed(self, task: Task, completed: bool = True) -> Task:
+        """Mark a task as complete or incomplete"""
+        self.set_completed_many([task], completed)
+        return task
+
+    def set_completed_many(self, tasks: Iterable[Task], completed: bool = True) -> List[Task]:
+        """Mark several tasks as complete or incomplete as one change"""
+        with self.lock:
+            tasks = self._unarchive_many(list(tasks))
+            if not tasks:
+                return tasks
+            edits = []
+            for task in tasks:
+                edits.append((task, {'completed': task.completed, 'completed_at': task.completed_at,
+                                     'due_date': task.due_date}))
+                if completed:
+                    task.mark_complete()
+                else:
+                    task.mark_incomplete()
+            self._changed(tasks)
+            self._record(describe_tasks("Complete" if completed else "Reopen", tasks), ('edit', edits))
+        return tasks
+
+    def remove(self, task: Task):
+        """Delete a single task"""
+        self.remove_many([task])
+
+    def remove_many(self, tasks: Iterable[Task]):
+        """Delete several tasks as one change"""
+        with self.lock:
+            tasks = list(tasks)
+            if self._archive is not None:
+                self._archived_by_id()
+            archived = [task for task in tasks if self._is_archived(task.id)]
+            if archived:
+                self._tombstone_archived(archived)
+                self.generation += 1
+                self._notify(archived, removed=True)
+
+            doomed = {task.id for task in tasks}
+            removed = [task for task in self.tasks if task.id in doomed]
+            if removed:
+                self.tasks = [task for task in self.tasks if task.id not in doomed]
+                for task in removed:
+                    del self._by_id[task.id]
+                self._changed(removed, removed=True)
+            if archived or removed:
+                if not self._history_paused:
+                    # Undo must not depend on a record another process may collect
+                    for task in removed:
+                        task.load_description()
+                self._record(describe_tasks("Delete", archived + removed), ('remove', archived + removed))
+
+    # ------------------------------------------------------------------
+    # Undo and redo
+    # ------------------------------------------------------------------
+
+    def _record(self, label: str, delta: tuple):
+        if self._history_paused:
+            return
+        if self._undo_group is not None:
+            self._undo_group.append((label, delta))
+        else:
+            self.history.record(label, [delta])
+
+    @contextmanager
+    def grouped(self, label: Optional[str] = None):
+        """Make every change inside the block a single undo step"""
+        with self.lock:
+            outermost = self._undo_group is None
+            if outermost:
+                self._undo_group = []
+            try:
+                yield self
+            finally:
+                if outermost:
+                    group, self._undo_group = self._undo_group, None
+                    if group:
+                        self.history.record(label or group[0][0], [delta for _, delta in group])
+
+    @contextmanager
+    def _without_history(self):
+        self._history_paused += 1
+        try:
+            yield
+        finally:
+            self._history_paused -= 1
+
+    def _replay(self, deltas: List[tuple]) -> List[tuple]:
+        """Apply the inverse of deltas, newest first, returning the deltas that reverse it"""
+        outer, self._undo_group = self._undo_group, []
+        try:
+            for kind, payload in reversed(deltas):
+                if kind == 'add':
+                    self.remove_many(payload)
+                elif kind == 'remove':
+                    self.add_many([task for task in payload if task.id not in self._by_id])
+                else:
+                    edits = []
+                    for task, fields in reversed(payload):
+                        if task.id not in self._by_id:
+                            continue  # Deleted since, e.g. by another process
+                        edits.append((task, {name: getattr(task, name) for name in fields}))
+                        for name, value in fields.items():
+                            setattr(task, name, value)
+                    if edits:
+                        self._changed([task for task, _ in edits])
+                        self._record("", ('edit', edits))
+            return [delta for _, delta in self._undo_group]
+        finally:
+            self._undo_group = outer
+
+    @metrics.timed("store.undo")
+    def undo(self) -> Optional[str]:
+        """Revert the most recent change, returning its label (None if there is none)"""
+        with self.lock:
+            entry = self.history.pop_undo()
+            if entry is None:
+                return None
+            label, deltas = entry
+            self.history.push_redo(label, self._replay(deltas))
+            return label
+
+    @metrics.timed("store.redo")
+    def redo(self) -> Optional[str]:
+        """Apply the most recently undone change again, returning its label"""
+        with self.lock:
+            entry = self.history.pop_redo()
+            if entry is None:
+                return None
+            label, deltas = entry
+            self.history.push_undo(label, self._replay(deltas))
+            return label
+
+    @contextmanager
+    def batch(self, label: Optional[str] = None):
+        """Group many changes into a single persistence commit and undo step"""
+        with self.lock, self.grouped(label):
+            self._batch_depth += 1
+            try:
+                yield self
+            finally:
+                self._batch_depth -= 1
+            if self._batch_depth == 0 and self._dirty:
+                self.save()
+
+    @metrics.timed("store.query")
+    def query(self, search: str = "", category: str = "All", priority: str = "All",
+              status: str = "All", sort: bool = False) -> List[Task]:
+        """Get tasks matching the search term and filters, optionally sorted"""
+        search_term = search.lower()
+        key = (search_term, category, priority, status, sort)
+        terms = parse_query(search)
+        if terms is not None:
+            terms += filter_terms(category, priority, status)
+        # Archived tasks are all completed, so only that filter reads them
+        include_archive = status == "Completed" or (terms is not None and self._completed_only(terms))
+        with self.lock:
+            if include_archive:
+                # Only stats the segments unless another process changed them
+                include_archive = bool(self._archived_by_id())
+            cache = self.query_cache
+            cache.validate((self.generation, self._archive_stamp))
+            ids = cache.get(key)
+            if ids is not None:
+                return self._resolve(ids, include_archive)
+
+            # A saved view already holds the answer
+            view = self.views.find(key[:4])
+            if view is not None:
+                filtered_tasks = self.views.results(view, sort)
+                cache.put(key, [task.id for task in filtered_tasks])
+                return filtered_tasks
+
+            # A structured query is planned afresh; it never narrows a plain search
+            base = cache.find_refinable(key) if terms is None else None
+            if base is not None:
+                # Extending a search only narrows an earlier, already ordered result
+                filtered_tasks = self._search(self._resolve(base, include_archive), search_term)
+            else:
+                if terms is not None:
+                    filtered_tasks = self._plan(terms, include_archive)[0]
+                else:
+                    tasks = self.tasks
+                    if include_archive:
+                        tasks = tasks + [task for task_id, task in self._archive.items()
+                                         if task_id not in self._by_id]
+                    filtered_tasks = self._scan(tasks, search_term, category, priority, status)
+                if sort:
+                    filtered_tasks.sort(key=task_sort_key)
+            cache.put(key, [task.id for task in filtered_tasks])
+            return filtered_tasks
+
+    def _resolve(self, ids: List[int], include_archive: bool) -> List[Task]:
+        """Tasks for cached IDs; the working set copy wins over an archived one"""
+        by_id = self._by_id
+        if not include_archive or not self._archive:
+            return [by_id[task_id] for task_id in ids]
+        archive = self._archive
+        return [by_id.get(task_id) or archive[task_id] for task_id in ids]
+
+    @metrics.timed("store.explain")
+    def explain(self, search: str = "", category: str = "All", priority: str = "All",
+                status: str = "All") -> List[Dict]:
+        """Run a query without the cache and describe how it was answered
+
+        Returns one dict per plan step with the operation, the condition,
+        and the estimated and actual number of tasks left after the step.
+        """
+        terms = parse_query(search)
+        if terms is None:
+            terms = [TextTerm(search)] if search else []
+        terms += filter_terms(category, priority, status)
+        with self.lock:
+            include_archive = status == "Completed" or self._completed_only(terms)
+            if include_archive:
+                self._archived_by_id()
+            return self._plan(terms, include_archive)[1]
+
+    @staticmethod
+    def _completed_only(terms: List) -> bool:
+        return any(isinstance(term, IndexTerm) and term.field == 'completed' and term.values == {True}
+                   for term in terms)
+
+    def _plan(self, terms: List, include_archive: bool = False) -> Tuple[List[Task], List[Dict]]:
+        """Answer a structured query, most selective index first
+
+        The indexed condition matching the fewest tasks produces the first
+        candidate set. Other indexed conditions are intersected with it when
+        that is cheaper than checking each candidate, and checked row by row
+        otherwise, as are text and readiness conditions.
+        """
+        terms = merge_due_terms(terms)
+        index = self.index
+        index.ensure()
+        total = len(index)
+        steps = []
+
+        def step(operation, term, estimated, actual):
+            steps.append({'operation': operation, 'condition': term.label if term else "all tasks",
+                          'estimated': int(round(estimated)), 'actual': actual})
+
+        indexed = sorted(((term.estimate(index), term) for term in terms if term.indexed),
+                         key=lambda pair: pair[0])
+        residual = [term for term in terms if not term.indexed]
+        if indexed:
+            estimated, first = indexed[0]
+            ids = first.ids(index)
+            step('index', first, estimated, len(ids))
+            later = []
+            for estimated, term in indexed[1:]:
+                expected = len(ids) * estimated / total if total else 0
+                single = isinstance(term, IndexTerm) and len(term.values) == 1
+                # A single bucket intersects in min(|ids|, |bucket|); unions
+                # and ranges cost their full size to build
+                if single or estimated < len(ids):
+                    ids = ids & term.ids(index)
+                    step('intersect', term, expected, len(ids))
+                else:
+                    later.append(term)
+            residual = later + residual
+            by_id = self._by_id
+            tasks = [by_id[task_id] for task_id in sorted(ids)]
+        else:
+            tasks = list(self.tasks)
+            step('scan', None, total, len(tasks))
+
+        for term in residual:
+            if term.indexed:
+                expected = len(tasks) * term.estimate(index) / total if total else 0
+            else:
+                expected = len(tasks) * term.selectivity
+            tasks = term.filter(self, tasks)
+            step('filter', term, expected, len(tasks))
+
+        if include_archive and self._archive:
+            archived = [task for task_id, task in self._archive.items() if task_id not in self._by_id]
+            scanned = len(archived)
+            for term in terms:
+                archived = term.filter(self, archived)
+            steps.append({'operation': 'archive', 'condition': "archived tasks",
+                          'estimated': scanned, 'actual': len(archived)})
+            tasks.extend(archived)
+        return tasks, steps
+
+    def _search(self, tasks: List[Task], search_term: str) -> List[Task]:
+        # One pass over just these tasks' stored descriptions instead of a read per task
+        refs = {task.description_ref for task in tasks if task._description is None}
+        stored_matches = self.descriptions.search(search_term, refs) if refs else set()
+        return [task for task in tasks
+                if search_term in task.title.lower() or
+                (task.description_ref in stored_matches if task._description is None
+                 else search_term in task._description.lower())]
+
+    def _scan(self, tasks: List[Task], search_term: str, category: str, priority: str,
+              status: str) -> List[Task]:
+        """Filter a full list of tasks"""
+        filtered_tasks = tasks.copy()
+
+        # Search filter
+        if search_term:
+            filtered_tasks = self._search(filtered_tasks, search_term)
+
+        # Category filter
+        if category != "All":
+            filtered_tasks = [task for task in filtered_tasks
+                            if task.category == category]
+
+        # Priority filter
+        if priority != "All":
+            filtered_tasks = [task for task in filtered_tasks
+                            if task.priority == priority]
+
+        # Status filter
+        if status == "Completed":
+            filtered_tasks = [task for task in filtered_tasks if task.completed]
+        elif status == "Pending":
+            filtered_tasks = [task for task in filtered_tasks if not task.completed]
+        elif status in ("Ready", "Blocked"):
+            open_blockers = self.dependencies.open_blockers
+            blocked = status == "Blocked"
+            filtered_tasks = [task for task in filtered_tasks
+                              if not task.completed and (open_blockers.get(task.id, 0) > 0) == blocked]
+
+        return filtered_tasks
+
+    @metrics.timed("store.statistics")
+    def statistics(self) -> Dict:
+        """Calculate totals plus category, priority and overdue breakdowns"""
+        today = date.today()
+        category_stats = {}
+        priority_stats = {}
+        overdue_tasks = []
+        completed_tasks = 0
+        recurring_tasks = 0
+
+        for task in self.tasks:
+            if task.recurrence:
+                recurring_tasks += 1
+            for breakdown, key in ((category_stats, task.category), (priority_stats, task.priority)):
+                if key not in breakdown:
+                    breakdown[key] = {'total': 0, 'completed': 0}
+                breakdown[key]['total'] += 1
+                if task.completed:
+                    breakdown[key]['completed'] += 1
+            if task.completed:
+                completed_tasks += 1
+            elif is_overdue(task, today):
+                overdue_tasks.append(task)
+
+        total_tasks = len(self.tasks)
+        return {
+            'total': total_tasks,
+            'completed': completed_tasks,
+            'pending': total_tasks - completed_tasks,
+            'overdue': len(overdue_tasks),
+            'completion_rate': (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0.0,
+            'recurring': recurring_tasks,
+            'upcoming': len(self.occurrences(today, today + timedelta(days=UPCOMING_DAYS - 1))),
+            'category_breakdown': category_stats,
+            'priority_breakdown': priority_stats,
+            'overdue_tasks': overdue_tasks
+        }
+
+    @metrics.timed("store.occurrences")
+    def occurrences(self, first: date, last: date) -> List[Tuple[date, Task]]:
+        """(day, task) pairs for open tasks due from first to last, by day
+
+        Recurring tasks contribute every occurrence in the window. These are
+        generated from their rules here and never stored.
+        """
+        first_text = first.strftime(DATE_FORMAT)
+        last_text = last.strftime(DATE_FORMAT)
+        result = []
+        with self.lock:
+            by_id = self._by_id
+            # One-off tasks come from a slice of the sorted due date index
+            for task_id in self.index.due_between(first_text, last_text):
+                task = by_id[task_id]
+                if not task.completed and not task.recurrence:
+                    result.append((date.fromisoformat(task.due_date), task))
+            # A recurring task can fall due in any window after its due date
+            for task_id in self.index.recurring:
+                task = by_id[task_id]
+                # ISO dates compare correctly as text
+                if not task.completed and task.due_date and task.due_date <= last_text:
+                    result.extend((day, task) for day in task.occurrences(first, last))
+        result.sort(key=lambda item: item[0])
+        return result
+
+    @metrics.timed("store.save")
+    def save(self, compact: bool = False):
+        """Merge other processes' saved changes, then journal this process's own"""
+        with self.lock, self.file_lock:
+            self._pull()
+            if self._pending:
+                self._append_journal()
+            if compact or self._journal_entries >= self.COMPACT_THRESHOLD:
+                with metrics.timer("store.compact"):
+                    self._compact()
+            self._dirty = False
+
+    @metrics.timed("store.load")
+    def load(self):
+        """Load the snapshot and replay the journal, discarding unsaved changes"""
+        with self.lock, self.file_lock:
+            self.tasks = []
+            self._by_id = {}
+            self._pending = {}
+            # The history refers to Task objects that are about to be replaced
+            self.history.clear()
+            self.views.refresh()
+            generation = self.generation
+            self._reload()
+            if self.generation == generation:
+                # Nothing was loaded, but listeners still hold the old tasks
+                self._notify(None)
+            self.generation += 1
+            self._dirty = False
+
+    def sync(self) -> bool:
+        """Merge changes saved by other processes, returning True if any arrived"""
+        # Cheap stat checks first so idle polling never takes the file lock
+        if self._journal_stat() == self._journal_stamp and not self._archive_changed():
+            return False
+        with self.lock, self.file_lock:
+            before = self.generation
+            self._pull()
+            if self._archive_changed():
+                # Deleting an archived task only writes to the archive
+                self._read_archive()
+                self.generation += 1
+            return self.generation != before
+
+    def _journal_stat(self):
+        try:
+            stat = os.stat(self.journal_file)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    @staticmethod
+    def _read_entries(f) -> tuple:
+        """Read complete journal lines, returning (entries, bytes consumed)"""
+        entries = []
+        consumed = 0
+        for line in f:
+            if not line.endswith(b'\n'):
+                break  # A writer crashed mid-line; the next save truncates it
+            consumed += len(line)
+            entries.append(json.loads(line))
+        return entries, consumed
+
+    @staticmethod
+    def _apply_entries(records: Dict, entries: List[Dict]):
+        for entry in entries:
+            if entry['op'] == 'put':
+                records[entry['task']['id']] = entry['task']
+            else:
+                records[entry['id']] = None
+
+    def _reload(self):
+        """Rebuild the in-memory tasks from the snapshot plus the whole journal"""
+        records = {}
+        if os.path.exists(self.data_file):
+            with open(self.data_file, 'r') as f:
+                for data in json.load(f):
+                    records[data['id']] = data
+
+        self._file_generation = 0
+        self._journal_offset = 0
+        self._journal_entries = 0
+        self._journal_stamp = self._journal_stat()
+        if self._journal_stamp is not None:
+            with open(self.journal_file, 'rb') as f:
+                header = f.readline()
+                self._file_generation = json.loads(header)['generation']
+                entries, consumed = self._read_entries(f)
+            self._apply_entries(records, entries)
+            self._journal_offset = len(header) + consumed
+            self._journal_entries = len(entries)
+
+        self._merge(records, full=True)
+
+    def _pull(self):
+        """Apply journal entries appended since this process last looked"""
+        stamp = self._journal_stat()
+        if stamp == self._journal_stamp:
+            return
+        if stamp is None:
+            self._reload()
+            return
+
+        with open(self.journal_file, 'rb') as f:
+            if json.loads(f.readline())['generation'] != self._file_generation:
+                # Another process compacted the journal into a new snapshot
+                self._reload()
+                return
+            f.seek(self._journal_offset)
+            entries, consumed = self._read_entries(f)
+
+        records = {}
+        self._apply_entries(records, entries)
+        self._merge(records)
+        metrics.incr("store.merged_entries", len(entries))
+        self._journal_offset += consumed
+        self._journal_entries += len(entries)
+        self._journal_stamp = stamp
+
+    def _merge(self, records: Dict, full: bool = False):
+        """Fold saved records into the live tasks, keeping unsaved local edits
+
+        Existing Task objects are updated in place so that references held by
+        open windows stay valid. With ``full`` set, tasks missing from
+        ``records`` are dropped as well.
+        """
+        removed = set()
+        updated = []
+        for task_id, data in records.items():
+            if task_id in self._pending:
+                continue  # Our newer, unsaved change wins
+            task = self._by_id.get(task_id)
+            if data is None:
+                if task is not None:
+                    removed.add(task_id)
+            elif task is None:
+                task = Task.from_dict(data, self.descriptions)
+                self.tasks.append(task)
+                self._by_id[task_id] = task
+                updated.append(task)
+            else:
+                task.__dict__.update(Task.from_dict(data, self.descriptions).__dict__)
+                updated.append(task)
+
+        if full:
+            removed.update(task_id for task_id in self._by_id
+                           if task_id not in records and task_id not in self._pending)
+        removed_tasks = [self._by_id[task_id] for task_id in removed]
+        if removed:
+            self.tasks = [task for task in self.tasks if task.id not in removed]
+            for task_id in removed:
+                del self._by_id[task_id]
+
+        if updated or removed:
+            self.generation += 1
+            if full:
+                self._notify(None)
+            else:
+                if updated:
+                    self._notify(updated)
+                if removed_tasks:
+                    self._notify(removed_tasks, removed=True)
+
+    def _write_journal_header(self, path: str, generation: int) -> int:
+        header = (json.dumps({'generation': generation}) + '\n').encode('utf-8')
+        with open(path, 'wb') as f:
+            f.write(header)
+        return len(header)
+
+    def _append_journal(self):
+        """Append pending changes to the journal (file lock must be held)"""
+        if self._journal_stamp is None:
+            self._file_generation += 1
+            self._journal_offset = self._write_journal_header(self.journal_file, self._file_generation)
+            self._journal_entries = 0
+
+        self._store_descriptions([task for task in self._pending.values() if task is not None])
+        lines = []
+        for task_id, task in self._pending.items():
+            if task is None:
+                lines.append(json.dumps({'op': 'delete', 'id': task_id}))
+            else:
+                lines.append(json.dumps({'op': 'put', 'task': task.to_record()}))
+        data = ('\n'.join(lines) + '\n').encode('utf-8')
+
+        with open(self.journal_file, 'r+b') as f:
+            # Drop any half-written line left behind by a crashed writer
+            f.truncate(self._journal_offset)
+            f.seek(self._journal_offset)
+            f.write(data)
+
+        self._journal_offset += len(data)
+        self._journal_entries += len(lines)
+        self._journal_stamp = self._journal_stat()
+        self._pending = {}
+
+    def _store_descriptions(self, tasks: List[Task]):
+        """Move long in-memory descriptions to the description file (file lock must be held)
+
+        Descriptions whose record another process collected while these
+        tasks were unsaved are read back from the replaced file and stored
+        again.
+        """
+        detached = [task for task in tasks if task._description is None]
+        if detached:
+            missing = self.descriptions.missing({task.description_ref for task in detached})
+            for task in detached:
+                if task.description_ref in missing:
+                    task.load_description()
+        long_tasks = [task for task in tasks
+                      if task._description is not None and len(task._description) > INLINE_DESCRIPTION_LIMIT]
+        if long_tasks:
+            keys = self.descriptions.put_many([task._description for task in long_tasks])
+            for task, key in zip(long_tasks, keys):
+                task.detach_description(self.descriptions, key)
+
+    def _compact(self):
+        """Write a fresh snapshot and start an empty journal (file lock must be held)"""
+        generation = self._file_generation + 1
+        snapshot_tmp = self.data_file + ".tmp"
+        journal_tmp = self.journal_file + ".tmp"
+        self._store_descriptions(self.tasks)
+        with open(snapshot_tmp, 'w') as f:
+            json.dump([task.to_record() for task in self.tasks], f, indent=2)
+        header_size = self._write_journal_header(journal_tmp, generation)
+
+        # Snapshot first: replaying the old journal over the new snapshot
+        # after a crash between the two renames is harmless
+        os.replace(snapshot_tmp, self.data_file)
+        os.replace(journal_tmp, self.journal_file)
+
+        self._file_generation = generation
+        self._journal_offset = header_size
+        self._journal_entries = 0
+        self._journal_stamp = self._journal_stat()
+
+        # Every saved task is in the snapshot now, so unreferenced descriptions
+        # can go; undo entries for deleted tasks hold their text
+        live = {task.description_ref for task in self.tasks if task.description_ref}
+        self.descriptions.collect(live)
+
+    # ------------------------------------------------------------------
+    # Archive of old completed tasks
+    # ------------------------------------------------------------------
+    #
+    # Each month of completions has its own append-only, gzip-compressed
+    # JSON-lines segment in ``<data file>.archive/``. New records are written
+    # as extra gzip members; deleting or restoring a task appends a tombstone
+    # to the segment holding it.
+
+    def archive_segments(self) -> List[str]:
+        """Paths of the archive segment files, oldest month first"""
+        try:
+            names = sorted(name for name in os.listdir(self.archive_dir) if name.endswith('.jsonl.gz'))
+        except FileNotFoundError:
+            return []
+        return [os.path.join(self.archive_dir, name) for name in names]
+
+    def _archive_listing_stamp(self):
+        stamp = []
+        for path in self.archive_segments():
+            stat = os.stat(path)
+            stamp.append((path, stat.st_size, stat.st_mtime_ns))
+        return tuple(stamp)
+
+    @staticmethod
+    def read_archive_segment(path: str) -> Dict[int, Optional[Dict]]:
+        """Read one segment as task ID -> record, or None for tombstones"""
+        records = {}
+        try:
+            with gzip.open(path, 'rb') as f:
+                for line in f:
+                    entry = json.loads(line)
+                    if entry['op'] == 'put':
+                        records[entry['task']['id']] = entry['task']
+                    else:
+                        records[entry['id']] = None
+        except (EOFError, OSError, ValueError) as e:
+            # A writer crashed mid-member; keep what was readable
+            print(f"Error reading archive segment {path}: {e}")
+        return records
+
+    def _archive_changed(self) -> bool:
+        """Whether another process changed an archive this process has read"""
+        return self._archive is not None and self._archive_listing_stamp() != self._archive_stamp
+
+    def _archived_by_id(self) -> Dict[int, Task]:
+        """Archived tasks by ID, (re)reading the segments if they changed"""
+        with self.lock:
+            stamp = self._archive_listing_stamp()
+            if self._archive is None or stamp != self._archive_stamp:
+                with self.file_lock:
+                    self._read_archive()
+            return self._archive
+
+    @metrics.timed("store.load_archive")
+    def _read_archive(self):
+        archive = {}
+        segments = {}
+        for path in self.archive_segments():
+            name = os.path.basename(path)
+            for task_id, data in self.read_archive_segment(path).items():
+                if data is None:
+                    if segments.get(task_id) == name:
+                        archive.pop(task_id, None)
+                        segments.pop(task_id, None)
+                else:
+                    archive[task_id] = Task.from_dict(data)
+                    segments[task_id] = name
+        self._archive = archive
+        self._archive_segment = segments
+        self._archive_stamp = self._archive_listing_stamp()
+        # Another process may have deleted or restored archived tasks
+        self.views.archive_reloaded()
+
+    def archived_tasks(self) -> List[Task]:
+        """Archived tasks that are not also in the working set"""
+        return [task for task_id, task in self._archived_by_id().items()
+                if task_id not in self._by_id]
+
+    def _is_archived(self, task_id: int) -> bool:
+        return (self._archive is not None and task_id in self._archive
+                and task_id not in self._by_id)
+
+    def _append_archive(self, entries_by_segment: Dict[str, List[Dict]]):
+        """Append entries as a new gzip member per segment (file lock must be held)"""
+        os.makedirs(self.archive_dir, exist_ok=True)
+        for name, entries in entries_by_segment.items():
+            data = ''.join(json.dumps(entry) + '\n' for entry in entries).encode('utf-8')
+            with gzip.open(os.path.join(self.archive_dir, name), 'ab') as f:
+                f.write(data)
+
+    def _tombstone_archived(self, tasks: List[Task]):
+        """Remove tasks from the archive by appending tombstones"""
+        entries = {}
+        for task in tasks:
+            name = self._archive_segment.pop(task.id)
+            entries.setdefault(name, []).append({'op': 'delete', 'id': task.id})
+            del self._archive[task.id]
+        with self.file_lock:
+            self._append_archive(entries)
+            self._archive_stamp = self._archive_listing_stamp()
+
+    def _unarchive_many(self, tasks: List[Task]) -> List[Task]:
+        """Move archived tasks back into the working set before changing them
+
+        Returns the tasks that still exist; one another process deleted
+        from the archive must not be brought back by the change.
+        """
+        if self._archive is not None:
+            self._archived_by_id()
+        archived = [task for task in tasks if self._is_archived(task.id)]
+        if archived:
+            self._tombstone_archived(archived)
+            # Only the edit that follows is undoable, not the move itself
+            with self._without_history():
+                self.add_many(archived)
+        return [task for task in tasks if task.id in self._by_id]
+
+    @staticmethod
+    def _segment_name(task: Task) -> str:
+        return (task.completed_at or task.created_at)[:7] + '.jsonl.gz'
+
+    @metrics.timed("store.archive_completed")
+    def archive_completed(self, max_age_days: Optional[int] = None) -> int:
+        """Move tasks completed more than max_age_days ago into the archive
+
+        Returns the number of tasks archived. The working set is saved and
+        compacted afterwards so the snapshot shrinks right away.
+        """
+        if max_age_days is None:
+            max_age_days = self.archive_after_days
+        if max_age_days <= 0:
+            return 0
+        cutoff = (datetime.now() - timedelta(days=max_age_days)).strftime(TIMESTAMP_FORMAT)
+
+        with self.lock, self.file_lock:
+            self._pull()
+            old_tasks = [task for task in self.tasks
+                         if task.completed and task.completed_at and task.completed_at < cutoff]
+            if not old_tasks:
+                return 0
+
+            entries = {}
+            for task in old_tasks:
+                entries.setdefault(self._segment_name(task), []).append(
+                    {'op': 'put', 'task': task.to_dict()})
+
+            # Archive first: after a crash a task may be in both places,
+            # and the working set copy wins
+            self._append_archive(entries)
+            if self._archive is not None:
+                for task in old_tasks:
+                    # Its description record is collected once it leaves the working set
+                    task.load_description()
+                    self._archive[task.id] = task
+                    self._archive_segment[task.id] = self._segment_name(task)
+                self._archive_stamp = self._archive_listing_stamp()
+
+            # Archiving only moves tasks, so it is not an undoable change
+            with self._without_history():
+                self.remove_many(old_tasks)
+            self.save(compact=True)
+            return len(old_tasks)
+
+    @metrics.timed("store.import_csv")
+    def import_csv(self, filename: str) -> int:
+        """Import tasks from a CSV file, returning the number imported"""
+        import csv
+        imported = []
+        with open(filename, 'r', newline='', encoding='utf-8') as csvfile:
+            for row in csv.DictReader(csvfile):
+                try:
+                    imported.append(Task(
+                        title=row.get('Title', ''),
+                        description=row.get('Description', ''),
+                        category=row.get('Category', 'General'),
+                        priority=row.get('Priority', 'Medium'),
+                        due_date=row.get('Due Date', ''),
+                        completed=row.get('Completed', '').lower() == 'true',
+                        recurrence=row.get('Repeat', '')
+                    ))
+                except Exception as e:
+                    print(f"Error importing row: {e}")
+        with self.grouped(f"Import {os.path.basename(filename)}"):
+            self.add_many(imported)
+        return len(imported)
+
+    @metrics.timed("store.export_csv")
+    def export_csv(self, filename: str) -> int:
+        """Export tasks to a CSV file, returning the number exported"""
+        import csv
+        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=CSV_FIELDS)
+            writer.writeheader()
+            for task in self.tasks:
+                writer.writerow({
+                    'Title': task.title,
+                    'Description': task.description,
+                    'Category': task.category,
+                    'Priority': task.priority,
+                    'Due Date': task.due_date,
+                    'Completed': task.completed,
+                    'Created At': task.created_at,
+                    'Completed At': task.completed_at or '',
+                    'Repeat': task.recurrence
+                })
+        return len(self.tasks)
@@ -0,0 +1,59 @@
+"""Archived tasks changed by another store sharing the data file."""
+
+from datetime import datetime, timedelta
+
+from taskstore import TIMESTAMP_FORMAT, Task, TaskStore
+
+
+def archived_store(data_file: str) -> TaskStore:
+    store = TaskStore(data_file)
+    store.load()
+    for title in ("Old report", "Old invoice"):
+        task = store.add(Task(title))
+        store.set_completed(task)
+        task.completed_at = (datetime.now() - timedelta(days=200)).strftime(TIMESTAMP_FORMAT)
+    store.save()
+    assert store.archive_completed(90) == 2
+    return store
+
+
+def test_archived_delete_reaches_other_store(tmp_path):
+    data_file = str(tmp_path / "tasks.json")
+    first = archived_store(data_file)
+    other = TaskStore(data_file)
+    other.load()
+    assert len(first.query(status="Completed")) == 2
+    doomed = other.query(status="Completed")[0]
+    stale = first.get(doomed.id, include_archive=True)
+
+    other.remove(other.get(doomed.id, include_archive=True))
+    other.save()
+
+    assert first.sync()
+    assert [task.id for task in first.query(status="Completed")] == [
+        task.id for task in other.query(status="Completed")]
+    # Reopening the copy this store still holds must not bring the task back
+    first.set_completed(stale, False)
+    first.save()
+    reloaded = TaskStore(data_file)
+    reloaded.load()
+    assert reloaded.get(doomed.id, include_archive=True) is None
+
+
+def test_saved_view_follows_archive_changed_elsewhere(tmp_path):
+    data_file = str(tmp_path / "tasks.json")
+    first = archived_store(data_file)
+    first.views.save("done", status="Completed")
+    assert first.views.count("done") == 2
+    assert len(first.views.tasks("done")) == 2
+    other = TaskStore(data_file)
+    other.load()
+    doomed = other.query(status="Completed")[0]
+
+    other.remove(other.get(doomed.id, include_archive=True))
+    other.save()
+
+    assert [task.id for task in first.views.tasks("done")] == [
+        task.id for task in other.query(status="Completed")]
+    first.query_cache.clear()
+    assert doomed.id not in [task.id for task in first.query(status="Completed")]
@@ -0,0 +1,73 @@
+"""Several processes sharing one data file must not lose each other's saves."""
+
+import os
+import subprocess
+import sys
+import textwrap
+
+from taskstore import TaskStore
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WORKERS = 6
+OPERATIONS = 150
+
+# Each worker adds its own tasks, edits, completes and deletes some of them,
+# saving after every operation. A low threshold makes the workers compact
+# the journal under each other many times.
+WORKER = textwrap.dedent("""
+    import sys
+    from taskstore import Task, TaskStore
+
+    data_file, worker, operations = sys.argv[1], int(sys.argv[2]), int(sys.argv[3])
+    TaskStore.COMPACT_THRESHOLD = 20
+    store = TaskStore(data_file)
+    store.load()
+    tasks = []
+    for n in range(operations):
+        if n % 5 == 4:
+            store.update(tasks[-1], priority="High", description=f"edited {worker}-{n}")
+        elif n % 5 == 3:
+            store.set_completed(tasks[-1])
+        elif n % 10 == 7:
+            store.remove(tasks.pop(0))
+        else:
+            tasks.append(store.add(Task(f"w{worker}-{n}", category="Work")))
+        store.save()
+""")
+
+
+def expected_tasks(worker: int) -> dict:
+    """Replay one worker's operations, returning title -> (priority, completed, description)"""
+    tasks = []
+    for n in range(OPERATIONS):
+        if n % 5 == 4:
+            tasks[-1][1:4:2] = ["High", f"edited {worker}-{n}"]
+        elif n % 5 == 3:
+            tasks[-1][2] = True
+        elif n % 10 == 7:
+            tasks.pop(0)
+        else:
+            tasks.append([f"w{worker}-{n}", "Medium", False, ""])
+    return {title: (priority, completed, description)
+            for title, priority, completed, description in tasks}
+
+
+def test_concurrent_writers_lose_no_updates(tmp_path):
+    data_file = str(tmp_path / "tasks.json")
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    workers = [subprocess.Popen([sys.executable, "-c", WORKER, data_file, str(worker), str(OPERATIONS)],
+                                env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+               for worker in range(WORKERS)]
+    for process in workers:
+        _, stderr = process.communicate(timeout=300)
+        assert process.returncode == 0, stderr.decode()
+
+    store = TaskStore(data_file)
+    store.load()
+    saved = {task.title: (task.priority, task.completed, task.description) for task in store.tasks}
+    expected = {}
+    for worker in range(WORKERS):
+        expected.update(expected_tasks(worker))
+    assert saved == expected
+    assert len({task.id for task in store.tasks}) == len(store.tasks)
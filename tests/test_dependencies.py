@@ -0,0 +1,24 @@
+"""Blockers that are deleted while other tasks still wait for them."""
+
+import pytest
+
+from taskstore import Task, TaskStore
+
+
+def test_edit_keeps_edge_to_deleted_blocker(tmp_path):
+    store = TaskStore(str(tmp_path / "tasks.json"))
+    store.load()
+    blocker = store.add(Task("Blocker"))
+    other = store.add(Task("Other"))
+    task = store.add(Task("Waiting"))
+    store.update(task, blocked_by=[blocker.id])
+    store.remove(blocker)
+
+    # The edit window passes every field back, blockers included
+    store.update(task, title="Still waiting", blocked_by=task.blocked_by)
+    assert task.title == "Still waiting"
+    store.update(task, blocked_by=task.blocked_by + [other.id])
+    assert task.blocked_by == [blocker.id, other.id]
+
+    with pytest.raises(ValueError):
+        store.update(other, blocked_by=[blocker.id])
@@ -0,0 +1,93 @@
+"""Out-of-line descriptions shared by several processes."""
+
+import os
+import subprocess
+import sys
+
+from taskstore import Task, TaskStore
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+COMPACT = "import sys; from taskstore import TaskStore; store = TaskStore(sys.argv[1]); store.load(); store.save(compact=True)"
+
+
+def compact_in_other_process(data_file: str):
+    subprocess.run([sys.executable, "-c", COMPACT, data_file], check=True,
+                   env=dict(os.environ, PYTHONPATH=ROOT))
+
+
+def test_description_survives_compaction_by_other_process(tmp_path):
+    data_file = str(tmp_path / "tasks.json")
+    store = TaskStore(data_file)
+    store.load()
+    # A deleted task leaves a dead record ahead of the live one, so the
+    # other process's compaction rewrites the file and moves the live record
+    dead = store.add(Task("Old", "x" * 20000))
+    store.save()
+    store.remove(dead)
+    store.save()
+    text = "Long description " * 100
+    task = store.add(Task("Report", text))
+    store.save()
+
+    compact_in_other_process(data_file)
+
+    assert task.description == text
+    store.set_completed(task)
+    store.save()
+    reloaded = TaskStore(data_file)
+    reloaded.load()
+    assert reloaded.get(task.id).description == text
+
+
+REWRITE = ("import sys; from taskstore import TaskStore; store = TaskStore(sys.argv[1]); store.load(); "
+           "store.update(store.tasks[0], description='Replaced ' * 20); store.save(compact=True)")
+
+
+def test_unsaved_edit_keeps_description_collected_elsewhere(tmp_path):
+    data_file = str(tmp_path / "tasks.json")
+    store = TaskStore(data_file)
+    store.load()
+    text = "Original description " * 1000
+    task = store.add(Task("Report", text))
+    store.save()
+
+    store.update(task, title="Report v2")
+    # The other process replaces the description and collects the old record
+    subprocess.run([sys.executable, "-c", REWRITE, data_file], check=True,
+                   env=dict(os.environ, PYTHONPATH=ROOT))
+    store.save()
+
+    reloaded = TaskStore(data_file)
+    reloaded.load()
+    assert reloaded.get(task.id).title == "Report v2"
+    assert reloaded.get(task.id).description == text
+
+
+def test_undo_delete_after_compaction_by_other_process(tmp_path):
+    data_file = str(tmp_path / "tasks.json")
+    store = TaskStore(data_file)
+    store.load()
+    text = "Deleted description " * 1000
+    task = store.add(Task("Report", text))
+    store.save()
+    store.remove(task)
+    store.save()
+
+    # The other process no longer sees the task and collects its record.
+    # A second rewrite replaces the file this process last indexed as well.
+    compact_in_other_process(data_file)
+    scratch = store.add(Task("Scratch", "Scratch description " * 1000))
+    store.save()
+    store.remove(scratch)
+    store.save()
+    compact_in_other_process(data_file)
+
+    # Undo the scratch task's delete and add, then the report's delete
+    for _ in range(3):
+        store.undo()
+    assert store.get(task.id).description == text
+    store.save()
+    reloaded = TaskStore(data_file)
+    reloaded.load()
+    assert reloaded.get(task.id).description == text